@@ -0,0 +1,112 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of STAC catalog writing: pystac `normalize_and_save` vs `CatalogWriter`.
+
+Usage:
+
+    python benchmarks/bench_catalog_writer.py --items 10000 100000
+"""
+
+import argparse
+import datetime
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pystac
+from pystac.extensions.file import FileExtension
+
+from eoap_tools.writer import CatalogWriter
+
+ASSETS_PER_ITEM = 3
+
+
+def make_items(count: int) -> Iterator[pystac.Item]:
+    """Generate `count` items with a few assets each."""
+    for i in range(count):
+        item = pystac.Item(
+            id=f"item-{i:06d}",
+            geometry=None,
+            bbox=None,
+            datetime=datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC),
+            properties={},
+        )
+        for band in range(ASSETS_PER_ITEM):
+            asset = pystac.Asset(
+                href=f"B{band:02d}.tif", media_type=pystac.MediaType.COG
+            )
+            item.add_asset(f"B{band:02d}", asset)
+            file_ext = FileExtension.ext(asset, add_if_missing=True)
+            file_ext.size = 1024
+            file_ext.checksum = "1220" + "00" * 32
+        yield item
+
+
+def write_pystac(path: Path, count: int) -> None:
+    """Build the catalog in memory and save it with pystac."""
+    catalog = pystac.Catalog(id="catalog", description="Benchmark catalog.")
+    for item in make_items(count):
+        catalog.add_item(item)
+    catalog.normalize_and_save(
+        str(path), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+
+
+def write_streaming(path: Path, count: int) -> None:
+    """Stream items to a `CatalogWriter`."""
+    catalog = pystac.Catalog(id="catalog", description="Benchmark catalog.")
+    with CatalogWriter(path, catalog) as writer:
+        for item in make_items(count):
+            writer.write_item(item)
+
+
+def measure(
+    write: Callable[[Path, int], None], count: int, memory: bool
+) -> tuple[float, float | None]:
+    """Return duration in seconds and peak traced memory in MiB."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        write(Path(tmp_dir) / "catalog", count)
+        duration = time.perf_counter() - start
+        peak = None
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1] / 1024**2
+            tracemalloc.stop()
+    return duration, peak
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000])
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Do not trace memory usage."
+    )
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'writer':>10} {'time (s)':>10} {'peak (MiB)':>11}")
+    for count in args.items:
+        for name, write in (("pystac", write_pystac), ("streaming", write_streaming)):
+            duration, peak = measure(write, count, memory=not args.no_memory)
+            peak_str = f"{peak:.1f}" if peak is not None else "-"
+            print(f"{count:>8} {name:>10} {duration:>10.2f} {peak_str:>11}")
+
+
+if __name__ == "__main__":
+    main()
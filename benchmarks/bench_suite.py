@@ -0,0 +1,452 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline benchmark suite of the I/O paths, against local stand-in remotes.
+
+- STAC assets are served by a local HTTP server, with byte ranges, and optional
+  latency and failure injection.
+- Datasets are cloned from a local git repository, their data pulled from a
+  local DVC remote.
+- Catalogs are generated from synthetic asset trees.
+
+Results are appended to a JSON lines file with the current git commit, and
+compared with the last run of the same parameters to report regressions.
+
+Usage:
+
+    python benchmarks/bench_suite.py --latency 0.01 --repeat 3
+    python benchmarks/bench_suite.py --only prepare_assets generate_catalog
+"""
+
+import argparse
+import contextlib
+import datetime
+import functools
+import json
+import logging
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, ClassVar
+
+import git
+import pystac
+from dvc.repo import Repo as DvcRepo
+
+from eoap_tools.cache import AssetCache
+from eoap_tools.sharinghub import MirrorCache, download_repository, pull_dataset
+from eoap_tools.stac import generate_catalog, prepare_assets
+
+RESULTS_PATH = Path(__file__).parent / "results.jsonl"
+SEED = 42
+CHANGE_RATE = 0.1
+"""Fraction of the repository files changed by each commit."""
+
+
+@dataclass(frozen=True)
+class Params:
+    """Size of the benchmark data sets."""
+
+    items: int = 20
+    assets: int = 4
+    asset_size: int = 1024**2
+    files: int = 200
+    commits: int = 20
+    dvc_files: int = 100
+    dvc_file_size: int = 64 * 1024
+    jobs: int = 4
+    latency: float = 0.0
+    failure_rate: float = 0.0
+
+
+@dataclass
+class Result:
+    """Median duration of a benchmark, with the amount of data processed."""
+
+    seconds: float
+    bytes: int = 0
+
+
+class BenchHandler(SimpleHTTPRequestHandler):
+    """HTTP request handler with single byte ranges and fault injection.
+
+    Every request is delayed by `latency` seconds, and answered with a "503
+    Service Unavailable" error with probability `failure_rate`.
+    """
+
+    latency = 0.0
+    failure_rate = 0.0
+    rng: ClassVar[random.Random] = random.Random(SEED)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Disable request logging."""
+
+    def do_HEAD(self) -> None:
+        """Serve a HEAD request."""
+        if self._inject_faults():
+            super().do_HEAD()
+
+    def do_GET(self) -> None:
+        """Serve a GET request, with optional byte range."""
+        if not self._inject_faults():
+            return
+        path = Path(self.translate_path(self.path))
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if not (path.is_file() and match):
+            super().do_GET()
+            return
+
+        stat = path.stat()
+        start = int(match[1])
+        end = min(int(match[2]) if match[2] else stat.st_size - 1, stat.st_size - 1)
+        if start >= stat.st_size:
+            self.send_error(416)
+            return
+        self.send_response(206)
+        self.send_header("ETag", f'"{stat.st_mtime_ns}-{stat.st_size}"')
+        self.send_header("Content-Range", f"bytes {start}-{end}/{stat.st_size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        with path.open("rb") as f:
+            f.seek(start)
+            self.wfile.write(f.read(end - start + 1))
+
+    def end_headers(self) -> None:
+        """Advertise byte range support and a validator on full responses."""
+        if self._headers_buffer and b" 200 " in self._headers_buffer[0]:
+            path = Path(self.translate_path(self.path))
+            if path.is_file():
+                stat = path.stat()
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("ETag", f'"{stat.st_mtime_ns}-{stat.st_size}"')
+        super().end_headers()
+
+    def _inject_faults(self) -> bool:
+        """Delay the request, return False if it was answered with an error."""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            self.send_error(503)
+            return False
+        return True
+
+
+@contextlib.contextmanager
+def serve(directory: Path, latency: float, failure_rate: float) -> Iterator[str]:
+    """Serve `directory` on localhost, yield the server base URL."""
+    handler_class = type(
+        "Handler",
+        (BenchHandler,),
+        {"latency": latency, "failure_rate": failure_rate},
+    )
+    handler = functools.partial(handler_class, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def write_files(path: Path, count: int, size: int, prefix: str = "") -> int:
+    """Write `count` files of `size` pseudo-random bytes, return total size."""
+    rng = random.Random(SEED)
+    path.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (path / f"{prefix}{i:05d}.bin").write_bytes(rng.randbytes(size))
+    return count * size
+
+
+def write_stac_catalog(path: Path, base_url: str, params: Params) -> int:
+    """Write a catalog of items with assets served from `base_url`."""
+    size = write_files(path / "assets", params.assets, params.asset_size, "B")
+    catalog = pystac.Catalog(id="catalog", description="Benchmark catalog.")
+    for i in range(params.items):
+        item = pystac.Item(
+            id=f"item-{i:05d}",
+            geometry=None,
+            bbox=None,
+            datetime=datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC),
+            properties={},
+        )
+        for band in range(params.assets):
+            href = f"{base_url}/assets/B{band:05d}.bin?item={i}"
+            item.add_asset(f"B{band:02d}", pystac.Asset(href=href))
+        catalog.add_item(item)
+    catalog.normalize_and_save(
+        str(path / "catalog"), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+    return size * params.items
+
+
+def init_repo(path: Path) -> git.Repo:
+    """Initialize a git repository with a committer identity."""
+    repo = git.Repo.init(path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "bench")
+        config.set_value("user", "email", "bench@example.com")
+    return repo
+
+
+def write_git_remote(path: Path, params: Params) -> git.Repo:
+    """Write a repository of `files` files changed over `commits` commits."""
+    repo = init_repo(path)
+    rng = random.Random(SEED)
+    for commit in range(params.commits):
+        for i in range(params.files):
+            if commit == 0 or rng.random() < CHANGE_RATE:
+                file_path = path / f"dir{i % 10}" / f"file{i:05d}.txt"
+                file_path.parent.mkdir(exist_ok=True)
+                file_path.write_text(rng.randbytes(1024).hex())
+        repo.git.add(A=True)
+        repo.index.commit(f"commit {commit}")
+    return repo
+
+
+def write_dvc_remote(path: Path, params: Params) -> tuple[git.Repo, int]:
+    """Write a DVC dataset repository, with data pushed to a local remote."""
+    repo = init_repo(path / "dataset")
+    dvc_repo = DvcRepo.init(repo.working_dir)
+    with dvc_repo.config.edit() as conf:
+        conf["remote"]["storage"] = {"url": str(path / "storage")}
+        conf["core"]["remote"] = "storage"
+    size = write_files(
+        path / "dataset" / "data", params.dvc_files, params.dvc_file_size
+    )
+    # DVC resolves paths from the working directory.
+    with contextlib.chdir(repo.working_dir):
+        dvc_repo.add(["data"])
+        dvc_repo.push()
+    dvc_repo.close()
+    repo.git.add(A=True)
+    repo.index.commit("data")
+    return repo, size
+
+
+def bench_prepare_assets(tmp_path: Path, params: Params) -> Iterator[Result]:
+    """Download every asset of a catalog, then materialize them from cache."""
+    http_path = tmp_path / "http"
+    with serve(http_path, params.latency, params.failure_rate) as base_url:
+        size = write_stac_catalog(http_path, base_url, params)
+        href = f"{base_url}/catalog/catalog.json"
+        cache = AssetCache(tmp_path / "cache")
+        start = time.perf_counter()
+        prepare_assets(
+            href, tmp_path / "out1", params.jobs, all_items=True, cache=cache
+        )
+        yield Result(time.perf_counter() - start, size)
+        start = time.perf_counter()
+        prepare_assets(
+            href, tmp_path / "out2", params.jobs, all_items=True, cache=cache
+        )
+        yield Result(time.perf_counter() - start, size)
+
+
+def bench_generate_catalog(tmp_path: Path, params: Params) -> Iterator[Result]:
+    """Catalog a tree of generated assets, one item per directory, with checksums."""
+    assets_path = tmp_path / "assets"
+    size = 0
+    for i in range(params.items):
+        size += write_files(
+            assets_path / f"item-{i:05d}", params.assets, params.asset_size, "B"
+        )
+    start = time.perf_counter()
+    generate_catalog(assets_path, tmp_path / "catalog", params.jobs, recursive=True)
+    yield Result(time.perf_counter() - start, size)
+
+
+def bench_download_repository(tmp_path: Path, params: Params) -> Iterator[Result]:
+    """Clone a repository, then clone it twice through a mirror cache."""
+    remote = write_git_remote(tmp_path / "remote", params)
+    url = remote.working_dir
+    start = time.perf_counter()
+    download_repository(url, tmp_path / "clone")
+    yield Result(time.perf_counter() - start)
+    mirrors = MirrorCache(tmp_path / "mirrors")
+    for name in ("mirror1", "mirror2"):
+        start = time.perf_counter()
+        download_repository(url, tmp_path / name, mirrors=mirrors)
+        yield Result(time.perf_counter() - start)
+
+
+def bench_dvc_pull(tmp_path: Path, params: Params) -> Iterator[Result]:
+    """Clone a DVC dataset and pull its data from the local remote."""
+    remote, size = write_dvc_remote(tmp_path, params)
+    start = time.perf_counter()
+    repo = download_repository(remote.working_dir, tmp_path / "clone")
+    dvc_repo = DvcRepo(repo.working_dir)
+    stats = pull_dataset(dvc_repo, jobs=params.jobs)
+    duration = time.perf_counter() - start
+    dvc_repo.close()
+    assert stats.bytes_transferred == size  # noqa: S101
+    yield Result(duration, size)
+
+
+BENCHMARKS: dict[str, tuple[Callable[[Path, Params], Iterator[Result]], list[str]]]
+BENCHMARKS = {
+    "prepare_assets": (bench_prepare_assets, ["download", "cached"]),
+    "generate_catalog": (bench_generate_catalog, ["checksum"]),
+    "download_repository": (
+        bench_download_repository,
+        ["clone", "mirror_cold", "mirror_warm"],
+    ),
+    "dvc_pull": (bench_dvc_pull, ["clone_pull"]),
+}
+
+
+def run(names: list[str], params: Params, repeat: int) -> dict[str, Result]:
+    """Run benchmarks `repeat` times, return median results by case name."""
+    runs: dict[str, list[Result]] = {}
+    for name in names:
+        bench, cases = BENCHMARKS[name]
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for case, result in zip(
+                    cases, bench(Path(tmp_dir), params), strict=True
+                ):
+                    runs.setdefault(f"{name}.{case}", []).append(result)
+    return {
+        case: Result(statistics.median(r.seconds for r in results), results[0].bytes)
+        for case, results in runs.items()
+    }
+
+
+def git_commit() -> tuple[str | None, bool]:
+    """Return current commit of the source tree, and whether it has changes."""
+    cwd = Path(__file__).parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],  # noqa: S607
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status)
+
+
+def load_previous(path: Path, params: Params) -> dict[str, Any] | None:
+    """Return the last stored run with the same parameters."""
+    previous = None
+    if path.exists():
+        for line in path.read_text().splitlines():
+            record = json.loads(line)
+            if record["params"] == asdict(params):
+                previous = record
+    return previous
+
+
+def report(
+    results: dict[str, Result],
+    previous: dict[str, Any] | None,
+    threshold: float,
+) -> bool:
+    """Print results against the previous run, return True on regression."""
+    regression = False
+    print(f"{'benchmark':<36} {'time (s)':>9} {'MiB/s':>8} {'previous':>9} {'':>7}")
+    for case, result in results.items():
+        throughput = "-"
+        if result.bytes:
+            throughput = f"{result.bytes / result.seconds / 1024**2:.1f}"
+        line = f"{case:<36} {result.seconds:>9.3f} {throughput:>8}"
+        before = (previous or {}).get("results", {}).get(case)
+        if before:
+            ratio = result.seconds / before["seconds"] - 1
+            flag = " !" if ratio > threshold else ""
+            regression = regression or bool(flag)
+            line += f" {before['seconds']:>9.3f} {ratio:>+6.0%}{flag}"
+        print(line)
+    if previous:
+        print(f"\nCompared with {previous['commit']} ({previous['date']}).")
+    return regression
+
+
+def main() -> None:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=RESULTS_PATH,
+        help="JSON lines file of the stored results.",
+    )
+    parser.add_argument(
+        "--no-store", action="store_true", help="Do not store the results."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown reported as a regression.",
+    )
+    for name, default in asdict(Params()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default))
+    args = parser.parse_args()
+    logging.getLogger("dvc").setLevel(logging.WARNING)
+    params = Params(
+        **{
+            name: value
+            for name in asdict(Params())
+            if (value := getattr(args, name)) is not None
+        }
+    )
+
+    results = run(args.only or list(BENCHMARKS), params, args.repeat)
+    previous = load_previous(args.results, params)
+    regression = report(results, previous, args.threshold)
+
+    if not args.no_store:
+        commit, dirty = git_commit()
+        record = {
+            "commit": commit,
+            "dirty": dirty,
+            "date": datetime.datetime.now(tz=datetime.UTC).isoformat(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "params": asdict(params),
+            "results": {case: asdict(result) for case, result in results.items()},
+        }
+        with args.results.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+    if regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
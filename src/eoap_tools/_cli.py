@@ -14,19 +14,74 @@
 
 """Command-line interface."""
 
+import functools
 import logging
 import os
+import re
 import sys
 from importlib.metadata import metadata
 from pathlib import Path
 
 import click
 
-from eoap_tools.sharinghub import configure_dvc, download_repository
-from eoap_tools.stac import generate_catalog, prepare_assets
+from eoap_tools.defaults import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_JOBS,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RETRIES,
+    DEFAULT_SEARCH_PAGE_SIZE,
+    DEFAULT_SEGMENT_SIZE,
+    DEFAULT_SEGMENTS,
+    DEFAULT_STAC_CACHE_TTL,
+)
+from eoap_tools.metrics import get_metrics
+from eoap_tools.utils import LINK_MODES, parse_size
 
 logger = logging.getLogger(__name__)
 
+# Modules of the commands are imported by the commands themselves, so that each
+# process only pays for the dependencies of the command it runs.
+
+
+def _parse_size(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> int | None:
+    """Click callback parsing a size in bytes, with optional unit (K, M, G, T, P)."""
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx, param) from e
+
+
+def _compile_regex(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> re.Pattern[str] | None:
+    """Click callback compiling a regular expression."""
+    if value is None:
+        return None
+    try:
+        return re.compile(value)
+    except re.error as e:
+        raise click.BadParameter(str(e), ctx, param) from e
+
+
+def _env(*names: str) -> str | None:
+    """Return the value of the last environment variable of `names` which is set."""
+    value = None
+    for name in names:
+        value = os.environ.get(name, value)
+    return value
+
+
+def _env_path(path: Path | None, name: str) -> Path | None:
+    """Return `path`, or the path in environment variable `name` if not given."""
+    if not path and name in os.environ:
+        return Path(os.environ[name])
+    return path
+
 
 @click.group()
 @click.option(
@@ -35,7 +90,35 @@ logger = logging.getLogger(__name__)
     is_flag=True,
     help="Set log level to DEBUG.",
 )
-def main(verbose: bool) -> None:
+@click.option(
+    "--metrics-file",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Write a JSON performance report of the command: phases timings, "
+        "bytes moved, throughput, retries, cache hits and peak memory."
+    ),
+)
+@click.option(
+    "--profile",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Profile the command and write cProfile stats, or with a .collapsed or "
+        ".folded suffix the sampled stacks of all threads in collapsed format."
+    ),
+)
+@click.option(
+    "--profile-memory",
+    is_flag=True,
+    help="Also trace memory allocations, top allocators go to <profile>.memory.txt.",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    verbose: bool,
+    metrics_file: Path | None,
+    profile: Path | None,
+    profile_memory: bool,
+) -> None:
     """EOAP Tools CLI."""
     debug = verbose or (os.environ.get("DEBUG", "false").lower() in ["1", "true"])
     logging.basicConfig(
@@ -43,6 +126,35 @@ def main(verbose: bool) -> None:
         level=logging.DEBUG if debug else logging.INFO,
     )
 
+    metrics_file = _env_path(metrics_file, "EOAP_TOOLS__METRICS_FILE")
+    if metrics_file:
+        metrics = get_metrics()
+        metrics.reset()
+        metrics.command = ctx.invoked_subcommand
+        # Also written when the command fails.
+        ctx.call_on_close(functools.partial(_write_metrics, metrics_file))
+
+    profile = _env_path(profile, "EOAP_TOOLS__PROFILE")
+    if profile:
+        from eoap_tools.profiling import Profiler  # noqa: PLC0415
+
+        memory = os.environ.get("EOAP_TOOLS__PROFILE_MEMORY", "false").lower()
+        profiler = Profiler(profile, memory=profile_memory or memory in ["1", "true"])
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
+
+
+def _write_metrics(path: Path) -> None:
+    get_metrics().write_report(path)
+    logger.info("metrics written to: %s", path)
+
+
+def _add_subcommand(ctx: click.Context) -> None:
+    """Complete the command name of the metrics with the invoked subcommand."""
+    metrics = get_metrics()
+    if metrics.command and ctx.invoked_subcommand:
+        metrics.command += f" {ctx.invoked_subcommand}"
+
 
 @main.command()
 def version() -> None:
@@ -56,8 +168,10 @@ def version() -> None:
 
 
 @main.group()
-def stac() -> None:
+@click.pass_context
+def stac(ctx: click.Context) -> None:
     """STAC utilities."""
+    _add_subcommand(ctx)
 
 
 @stac.command("prepare-assets")
@@ -68,16 +182,332 @@ def stac() -> None:
     type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
     help="Path to the directory where the assets will be downloaded.",
 )
-def stac_prepare_assets(stac_input: str, output_path: Path | None) -> None:
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="Number of assets transferred concurrently.",
+)
+@click.option(
+    "--host-jobs",
+    type=click.IntRange(min=1),
+    help="Maximum concurrent downloads from the same host (default to jobs).",
+)
+@click.option(
+    "--segment-size",
+    metavar="SIZE",
+    default=str(DEFAULT_SEGMENT_SIZE),
+    callback=_parse_size,
+    show_default=True,
+    help="Size of the byte ranges of a segmented download.",
+)
+@click.option(
+    "--segments",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SEGMENTS,
+    show_default=True,
+    help="Parallel range requests per asset, 1 to disable segmented download.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help=(
+        "Resume an interrupted run in an existing output directory: "
+        "complete partial downloads and skip completed assets."
+    ),
+)
+@click.option(
+    "--sync",
+    is_flag=True,
+    help=(
+        "Update an existing output directory: skip assets up to date "
+        "(checksum, or remote ETag, Last-Modified and size, or local size and "
+        "mtime) and transfer the missing or outdated ones."
+    ),
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="Retries of failed HTTP requests (connection errors, 429 and 5xx).",
+)
+@click.option(
+    "--connect-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_CONNECT_TIMEOUT,
+    show_default=True,
+    help="HTTP connection timeout in seconds.",
+)
+@click.option(
+    "--read-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_READ_TIMEOUT,
+    show_default=True,
+    help="HTTP read timeout in seconds.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    help="Directory of the downloaded assets cache, shared between runs.",
+)
+@click.option(
+    "--cache-max-size",
+    metavar="SIZE",
+    callback=_parse_size,
+    help="Maximum size of the cache, least recently used assets are evicted.",
+)
+@click.option(
+    "--stac-cache-dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    help=(
+        "Directory of the remote STAC files cache, shared between runs and "
+        "revalidated with conditional requests."
+    ),
+)
+@click.option(
+    "--stac-cache-max-size",
+    metavar="SIZE",
+    callback=_parse_size,
+    help="Maximum size of the STAC files cache, least recently used are evicted.",
+)
+@click.option(
+    "--stac-cache-ttl",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_STAC_CACHE_TTL,
+    show_default=True,
+    help=(
+        "Maximum time in seconds a cached STAC file is used without revalidation, "
+        "whatever its Cache-Control max-age."
+    ),
+)
+@click.option(
+    "--verify/--no-verify",
+    default=True,
+    show_default=True,
+    help="Check assets against their file:checksum and file:size when available.",
+)
+@click.option(
+    "--link-mode",
+    type=click.Choice(LINK_MODES),
+    default="copy",
+    show_default=True,
+    help=(
+        "How local assets are materialized, "
+        "auto tries reflink, hardlink then falls back to a kernel-side copy."
+    ),
+)
+@click.option(
+    "--extract",
+    is_flag=True,
+    help=(
+        "Extract zip and tar (gz, bz2, xz, zst) archive assets in a directory "
+        "named by asset while reading them, without writing the archive."
+    ),
+)
+@click.option(
+    "--all-items",
+    is_flag=True,
+    help=(
+        "Prepare every item of the input catalog, child catalogs and collections "
+        "included, each in a sub-directory named by item id."
+    ),
+)
+@click.option(
+    "--search",
+    is_flag=True,
+    help=(
+        "Read STAC_INPUT as a STAC API, and prepare the items found by its "
+        "/search endpoint (implied by the search filters below), each in a "
+        "sub-directory named by item id."
+    ),
+)
+@click.option(
+    "--collection",
+    "collections",
+    multiple=True,
+    help="Search items of the collection (repeatable).",
+)
+@click.option(
+    "--bbox",
+    type=float,
+    nargs=4,
+    metavar="WEST SOUTH EAST NORTH",
+    help="Search items intersecting the bounding box.",
+)
+@click.option(
+    "--datetime",
+    "datetime_range",
+    metavar="DATETIME",
+    help="Search items at the datetime or in the range (e.g. 2024-01-01/..).",
+)
+@click.option(
+    "--max-items",
+    type=click.IntRange(min=1),
+    help="Maximum number of items searched.",
+)
+@click.option(
+    "--page-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SEARCH_PAGE_SIZE,
+    show_default=True,
+    help="Number of items per search results page.",
+)
+@click.option(
+    "--asset",
+    "asset_keys",
+    metavar="GLOB",
+    multiple=True,
+    help="Only prepare assets whose key matches the pattern (repeatable).",
+)
+@click.option(
+    "--role",
+    "roles",
+    multiple=True,
+    help="Only prepare assets with the role (repeatable).",
+)
+@click.option(
+    "--media-type",
+    "media_types",
+    metavar="GLOB",
+    multiple=True,
+    help="Only prepare assets whose media type matches the pattern (repeatable).",
+)
+@click.option(
+    "--max-asset-size",
+    metavar="SIZE",
+    callback=_parse_size,
+    help="Skip assets whose file:size is larger.",
+)
+def stac_prepare_assets(  # noqa: PLR0913
+    stac_input: str,
+    output_path: Path | None,
+    jobs: int,
+    host_jobs: int | None,
+    segment_size: int,
+    segments: int,
+    resume: bool,
+    sync: bool,
+    retries: int,
+    connect_timeout: float,
+    read_timeout: float,
+    cache_dir: Path | None,
+    cache_max_size: int | None,
+    stac_cache_dir: Path | None,
+    stac_cache_max_size: int | None,
+    stac_cache_ttl: float,
+    verify: bool,
+    link_mode: str,
+    extract: bool,
+    all_items: bool,
+    search: bool,
+    collections: tuple[str, ...],
+    bbox: tuple[float, float, float, float] | None,
+    datetime_range: str | None,
+    max_items: int | None,
+    page_size: int,
+    asset_keys: tuple[str, ...],
+    roles: tuple[str, ...],
+    media_types: tuple[str, ...],
+    max_asset_size: int | None,
+) -> None:
     """Prepare STAC item assets to output."""
+    from eoap_tools.cache import AssetCache, StacCache  # noqa: PLC0415
+    from eoap_tools.download import TransferOptions  # noqa: PLC0415
+    from eoap_tools.s3 import configure_s3  # noqa: PLC0415
+    from eoap_tools.session import SessionStacIO, configure_session  # noqa: PLC0415
+    from eoap_tools.stac import AssetFilter, prepare_assets  # noqa: PLC0415
+
     if not output_path:
         output_path = Path("stac-assets")
-    if output_path.exists():
+    if output_path.exists() and not (resume or sync):
         logger.error("output path already exists")
         sys.exit(-1)
 
+    cache_dir = _env_path(cache_dir, "EOAP_TOOLS__CACHE_DIR")
+    if not cache_max_size and "EOAP_TOOLS__CACHE_MAX_SIZE" in os.environ:
+        cache_max_size = parse_size(os.environ["EOAP_TOOLS__CACHE_MAX_SIZE"])
+    cache = AssetCache(cache_dir, max_size=cache_max_size) if cache_dir else None
+    if cache:
+        logger.info("assets cache: %s", cache.path)
+
+    stac_cache_dir = _env_path(stac_cache_dir, "EOAP_TOOLS__STAC_CACHE_DIR")
+    if not stac_cache_max_size and "EOAP_TOOLS__STAC_CACHE_MAX_SIZE" in os.environ:
+        stac_cache_max_size = parse_size(os.environ["EOAP_TOOLS__STAC_CACHE_MAX_SIZE"])
+    stac_cache = None
+    if stac_cache_dir:
+        logger.info("STAC files cache: %s", stac_cache_dir)
+        stac_cache = StacCache(
+            stac_cache_dir, max_size=stac_cache_max_size, ttl=stac_cache_ttl
+        )
+
+    configure_session(
+        pool_size=max(DEFAULT_POOL_SIZE, jobs * segments),
+        retries=retries,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+    )
+    configure_s3(
+        pool_size=max(DEFAULT_POOL_SIZE, jobs * segments),
+        retries=retries,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        endpoint_url=_env("AWS_ENDPOINT_URL", "EOAP_TOOLS__S3_ENDPOINT_URL"),
+        access_key_id=_env(
+            "ACCESS_KEY_ID", "AWS_ACCESS_KEY_ID", "EOAP_TOOLS__ACCESS_KEY_ID"
+        ),
+        secret_access_key=_env(
+            "SECRET_ACCESS_KEY",
+            "AWS_SECRET_ACCESS_KEY",
+            "EOAP_TOOLS__SECRET_ACCESS_KEY",
+        ),
+        session_token=_env(
+            "SESSION_TOKEN", "AWS_SESSION_TOKEN", "EOAP_TOOLS__SESSION_TOKEN"
+        ),
+    )
+    search_query = None
+    if search or collections or bbox or datetime_range:
+        search_query = {
+            "collections": list(collections) or None,
+            "bbox": list(bbox) if bbox else None,
+            "datetime": datetime_range,
+            "limit": page_size,
+        }
     logger.info("preparing %s at: %s", stac_input, output_path)
-    prepare_assets(stac_input, output_path)
+    options = TransferOptions(
+        segment_size=segment_size,
+        segments=segments,
+        resume=resume,
+        verify=verify,
+        link_mode=link_mode,
+        extract=extract,
+        sync=sync,
+    )
+    errors = prepare_assets(
+        stac_input,
+        output_path,
+        jobs=jobs,
+        host_jobs=host_jobs,
+        options=options,
+        cache=cache,
+        all_items=all_items,
+        asset_filter=AssetFilter(
+            keys=asset_keys,
+            roles=roles,
+            media_types=media_types,
+            max_size=max_asset_size,
+        ),
+        stac_io=SessionStacIO(cache=stac_cache),
+        search=search_query,
+        max_items=max_items,
+    )
+    if stac_cache:
+        stac_cache.evict()
+    if errors:
+        logger.error("%d asset(s) failed: %s", len(errors), ", ".join(sorted(errors)))
+        sys.exit(-1)
 
 
 @stac.command("generate-catalog")
@@ -93,21 +523,90 @@ def stac_prepare_assets(stac_input: str, output_path: Path | None) -> None:
     type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
     help="Path to the directory where the catalog will be generated.",
 )
-def stac_generate_catalog(assets_path: Path, output_path: Path | None) -> None:
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="Number of assets copied concurrently.",
+)
+@click.option(
+    "--checksum/--no-checksum",
+    default=True,
+    show_default=True,
+    help="Record assets file:checksum, computed while copying.",
+)
+@click.option(
+    "--link-mode",
+    type=click.Choice(LINK_MODES),
+    default="copy",
+    show_default=True,
+    help=(
+        "How assets are materialized in the catalog, "
+        "auto tries reflink, hardlink then falls back to a kernel-side copy."
+    ),
+)
+@click.option(
+    "-r",
+    "--recursive",
+    is_flag=True,
+    help="Scan subdirectories, with one item per directory.",
+)
+@click.option(
+    "--item-pattern",
+    metavar="REGEX",
+    callback=_compile_regex,
+    help=(
+        "Regular expression matched on files relative path, "
+        "its group 'item' (or first group) gives the item of matching files."
+    ),
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help=(
+        "Update the catalog if it exists: only new or changed files are "
+        "materialized, removed ones deleted, and only their items rewritten."
+    ),
+)
+def stac_generate_catalog(  # noqa: PLR0913
+    assets_path: Path,
+    output_path: Path | None,
+    jobs: int,
+    checksum: bool,
+    link_mode: str,
+    recursive: bool,
+    item_pattern: re.Pattern[str] | None,
+    incremental: bool,
+) -> None:
     """Generate STAC catalog from directory of assets to output."""
+    from eoap_tools.stac import generate_catalog  # noqa: PLC0415
+
     if not output_path:
         output_path = Path("stac-catalog")
-    if output_path.exists():
+    if output_path.exists() and not incremental:
         logger.error("output path already exists")
         sys.exit(-1)
 
     logger.info("cataloging directory %s at: %s", assets_path, output_path)
-    generate_catalog(assets_path, output_path)
+    generate_catalog(
+        assets_path,
+        output_path,
+        jobs=jobs,
+        checksum=checksum,
+        link_mode=link_mode,
+        recursive=recursive,
+        item_pattern=item_pattern,
+        incremental=incremental,
+    )
 
 
 @main.group()
-def sharinghub() -> None:
+@click.pass_context
+def sharinghub(ctx: click.Context) -> None:
     """SharingHub utilities."""
+    _add_subcommand(ctx)
 
 
 @sharinghub.command("download-dataset")
@@ -151,6 +650,70 @@ def sharinghub() -> None:
     type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
     help="Path to the directory where the dataset will be downloaded.",
 )
+@click.option(
+    "--depth",
+    type=click.IntRange(min=1),
+    help="Number of commits of history to download (shallow clone).",
+)
+@click.option(
+    "--filter",
+    "blob_filter",
+    metavar="FILTER",
+    help=(
+        "Partial clone filter, e.g. 'blob:none' to only download "
+        "the content of the checked out files."
+    ),
+)
+@click.option(
+    "--sparse",
+    "sparse_paths",
+    metavar="PATH",
+    multiple=True,
+    help=(
+        "Only check out the dataset path, with its DVC metadata (repeatable). "
+        "Files of the root and parent directories are always checked out."
+    ),
+)
+@click.option(
+    "--mirror-dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    help=(
+        "Directory of the repositories mirrors cache, shared between runs. "
+        "The repository mirror is updated then cloned locally."
+    ),
+)
+@click.option(
+    "--target",
+    "targets",
+    metavar="PATH",
+    multiple=True,
+    help=(
+        "Only pull the dataset path or glob pattern, relative to the dataset root "
+        "(repeatable). Directories are searched for DVC tracked data."
+    ),
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of parallel DVC downloads (default to DVC default).",
+)
+@click.option(
+    "--dvc-cache-dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    help="Directory of the DVC cache, shared between datasets and runs.",
+)
+@click.option(
+    "--dvc-cache-type",
+    "dvc_cache_types",
+    type=click.Choice(["reflink", "hardlink", "symlink", "copy"]),
+    multiple=True,
+    help=(
+        "Link of DVC cached files in the dataset, tried in the given order "
+        "(repeatable). Default to reflink, hardlink, symlink then copy "
+        "with a DVC cache directory."
+    ),
+)
 def sharinghub_download_dataset(  # noqa: PLR0913
     dataset_url: str,
     pull: bool,
@@ -160,26 +723,41 @@ def sharinghub_download_dataset(  # noqa: PLR0913
     access_key_id: str | None,
     secret_access_key: str | None,
     output_path: Path | None,
+    depth: int | None,
+    blob_filter: str | None,
+    sparse_paths: tuple[str, ...],
+    mirror_dir: Path | None,
+    targets: tuple[str, ...],
+    jobs: int | None,
+    dvc_cache_dir: Path | None,
+    dvc_cache_types: tuple[str, ...],
 ) -> None:
     """Download SharingHub dataset from repository URL."""
+    from eoap_tools.sharinghub import (  # noqa: PLC0415
+        DVC_CACHE_TYPES,
+        CloneOptions,
+        MirrorCache,
+        configure_dvc,
+        download_repository,
+        pull_dataset,
+    )
+
     logger.info("dataset url: %s", dataset_url)
 
     if not user:
-        user = os.environ.get("USER")
-        user = os.environ.get("EOAP_TOOLS__USER", user)
+        user = _env("USER", "EOAP_TOOLS__USER")
     if not access_token:
-        access_token = os.environ.get("ACCESS_TOKEN")
-        access_token = os.environ.get("EOAP_TOOLS__ACCESS_TOKEN", access_token)
+        access_token = _env("ACCESS_TOKEN", "EOAP_TOOLS__ACCESS_TOKEN")
     if not access_key_id:
-        access_key_id = os.environ.get("ACCESS_KEY_ID")
-        access_key_id = os.environ.get("AWS_ACCESS_KEY_ID", access_key_id)
-        access_key_id = os.environ.get("EOAP_TOOLS__ACCESS_KEY_ID", access_key_id)
+        access_key_id = _env(
+            "ACCESS_KEY_ID", "AWS_ACCESS_KEY_ID", "EOAP_TOOLS__ACCESS_KEY_ID"
+        )
         access_key_id = access_key_id or access_token
     if not secret_access_key:
-        secret_access_key = os.environ.get("SECRET_ACCESS_KEY")
-        secret_access_key = os.environ.get("AWS_SECRET_ACCESS_KEY", secret_access_key)
-        secret_access_key = os.environ.get(
-            "EOAP_TOOLS__SECRET_ACCESS_KEY", secret_access_key
+        secret_access_key = _env(
+            "SECRET_ACCESS_KEY",
+            "AWS_SECRET_ACCESS_KEY",
+            "EOAP_TOOLS__SECRET_ACCESS_KEY",
         )
         secret_access_key = secret_access_key or access_token
 
@@ -188,24 +766,38 @@ def sharinghub_download_dataset(  # noqa: PLR0913
     logger.debug("access key id: %s", access_key_id)
     logger.debug("secret access key: %s", secret_access_key)
 
+    mirror_dir = _env_path(mirror_dir, "EOAP_TOOLS__GIT_MIRROR_DIR")
+    mirrors = MirrorCache(mirror_dir) if mirror_dir else None
+    if mirrors:
+        logger.info("repositories mirrors: %s", mirrors.path)
+
+    clone_options = None
+    if depth or blob_filter or sparse_paths:
+        clone_options = CloneOptions(
+            depth=depth, blob_filter=blob_filter, sparse_paths=sparse_paths
+        )
     git_repo = download_repository(
         url=dataset_url,
         path=output_path,
         user=user,
         token=access_token,
+        revision=version,
+        options=clone_options,
+        mirrors=mirrors,
     )
     git_repo_path = Path(git_repo.working_dir)
     logger.info("repository: %s", git_repo_path)
 
-    if version:
-        logger.info("checkout repository revision: %s", version)
-        git_repo.git.checkout(version)
-
+    dvc_cache_dir = _env_path(dvc_cache_dir, "EOAP_TOOLS__DVC_CACHE_DIR")
+    if dvc_cache_dir and not dvc_cache_types:
+        dvc_cache_types = DVC_CACHE_TYPES
     dvc_repo = configure_dvc(
         git_repo,
         password=access_token,
         s3_access_key_id=access_key_id,
         s3_secret_access_key=secret_access_key,
+        cache_dir=dvc_cache_dir,
+        cache_types=dvc_cache_types,
     )
     if not dvc_repo:
         logger.warning("invalid dvc repository: %s", git_repo.working_dir)
@@ -213,4 +805,47 @@ def sharinghub_download_dataset(  # noqa: PLR0913
 
     if pull:
         logger.info("dvc pull...")
-        dvc_repo.pull(force=True)
+        stats = pull_dataset(dvc_repo, targets=targets, jobs=jobs)
+        logger.info(
+            "dvc pull: %d files (%d bytes) transferred, %d files (%d bytes) cached",
+            stats.files_transferred,
+            stats.bytes_transferred,
+            stats.files_cached,
+            stats.bytes_cached,
+        )
+
+
+@sharinghub.command("prune-mirrors")
+@click.option(
+    "--mirror-dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    help="Directory of the repositories mirrors cache.",
+)
+@click.option(
+    "--max-size",
+    metavar="SIZE",
+    callback=_parse_size,
+    help="Remove least recently used mirrors until the cache is smaller.",
+)
+@click.option(
+    "--max-age",
+    type=click.FloatRange(min=0),
+    metavar="DAYS",
+    help="Remove mirrors unused for more days.",
+)
+def sharinghub_prune_mirrors(
+    mirror_dir: Path | None, max_size: int | None, max_age: float | None
+) -> None:
+    """Remove least recently used repositories mirrors."""
+    from eoap_tools.sharinghub import MirrorCache  # noqa: PLC0415
+
+    mirror_dir = _env_path(mirror_dir, "EOAP_TOOLS__GIT_MIRROR_DIR")
+    if not mirror_dir:
+        logger.error("no mirror directory given")
+        sys.exit(-1)
+
+    mirrors = MirrorCache(mirror_dir)
+    freed = mirrors.prune(
+        max_size=max_size, max_age=max_age * 86400 if max_age is not None else None
+    )
+    logger.info("freed %d bytes", freed)
@@ -0,0 +1,250 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools cache module."""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import stat
+import time
+import uuid
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+from eoap_tools.defaults import DEFAULT_STAC_CACHE_TTL
+from eoap_tools.utils import file_lock, link_file
+
+logger = logging.getLogger(__name__)
+
+LOCK_STRIPES_DIGITS = 3
+
+
+class AssetCache:
+    """On-disk cache of downloaded assets, with LRU eviction.
+
+    Entries are keyed by asset href and version (checksum or ETag), and stored
+    read-only under `objects/`. Last access is tracked with the entries mtime.
+    File locks make the cache safe to share between concurrent processes.
+    """
+
+    def __init__(self, path: Path, max_size: int | None = None) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.objects_path = path / "objects"
+        self.tmp_path = path / "tmp"
+        self.locks_path = path / "locks"
+
+    @staticmethod
+    def key(href: str, version: str) -> str:
+        """Return the cache key of `href` at `version`."""
+        return hashlib.sha256(f"{href}\n{version}".encode()).hexdigest()
+
+    def object_path(self, key: str) -> Path:
+        """Return the path of the cache entry `key`."""
+        return self.objects_path / key[:2] / key
+
+    def download_path(self, key: str) -> Path:
+        """Return the path where the cache entry `key` is downloaded before `add`."""
+        self.tmp_path.mkdir(parents=True, exist_ok=True)
+        return self.tmp_path / key
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Lock the cache entry `key` across processes."""
+        # Locks are striped to bound the number of lock files.
+        with file_lock(self.locks_path / f"{key[:LOCK_STRIPES_DIGITS]}.lock"):
+            yield
+
+    def get(self, key: str, dest_path: Path) -> str | None:
+        """Materialize the cache entry `key` at `dest_path` if it exists.
+
+        Returns the materialization method (reflink, hardlink or copy), None on
+        cache miss.
+        """
+        object_path = self.object_path(key)
+        try:
+            os.utime(object_path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            # Entries of other users of a shared cache cannot be touched.
+            logger.debug("cache: cannot touch entry %s: %s", key, e)
+        dest_path.unlink(missing_ok=True)
+        return link_file(object_path, dest_path)
+
+    def add(self, key: str, src_path: Path) -> None:
+        """Move `src_path` into the cache as entry `key`."""
+        object_path = self.object_path(key)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        # Entries are read-only, to protect hardlinks from modifications.
+        src_path.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        src_path.replace(object_path)
+
+    def evict(self) -> int:
+        """Remove least recently used entries above `max_size`, return freed bytes."""
+        if self.max_size is None or not self.objects_path.is_dir():
+            return 0
+
+        with file_lock(self.path / "evict.lock"):
+            entries = []
+            total_size = 0
+            for prefix_dir in os.scandir(self.objects_path):
+                for entry in os.scandir(prefix_dir.path):
+                    entry_stat = entry.stat()
+                    entries.append(
+                        (entry_stat.st_mtime, entry_stat.st_size, entry.path)
+                    )
+                    total_size += entry_stat.st_size
+
+            freed = 0
+            entries.sort()
+            for _, size, path in entries:
+                if total_size - freed <= self.max_size:
+                    break
+                with self.lock(Path(path).name):
+                    Path(path).unlink(missing_ok=True)
+                freed += size
+
+        if freed:
+            logger.info("cache: evicted %d bytes", freed)
+        return freed
+
+
+class StacCache:
+    """On-disk cache of remote STAC JSON documents, revalidated with their ETag.
+
+    Documents are stored with their validators (`ETag`, `Last-Modified`) and used
+    without request while fresh, as given by `Cache-Control: max-age` capped at
+    `ttl` seconds. Stale documents are revalidated with a conditional request,
+    documents with `Cache-Control: no-store` are not stored. Least recently used
+    documents are evicted above `max_size`.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_size: int | None = None,
+        ttl: float = DEFAULT_STAC_CACHE_TTL,
+    ) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def entry_path(self, href: str) -> Path:
+        """Return the path of the cached document of `href`."""
+        key = hashlib.sha256(href.encode()).hexdigest()
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, href: str) -> dict[str, Any] | None:
+        """Return the cached document of `href`, None if not cached.
+
+        The entry has the document `text`, its `etag`, `last_modified` and
+        `fresh_until` timestamp.
+        """
+        entry_path = self.entry_path(href)
+        try:
+            entry: dict[str, Any] = json.loads(entry_path.read_text())
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("href") == href else None
+
+    @staticmethod
+    def is_fresh(entry: dict[str, Any]) -> bool:
+        """Whether the cached document can be used without revalidation."""
+        return bool(time.time() < entry["fresh_until"])
+
+    def put(self, href: str, text: str, headers: Mapping[str, str]) -> None:
+        """Store the document `text` of `href`, with its response `headers`."""
+        entry = {
+            "href": href,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "text": text,
+        }
+        self._write(entry, headers)
+
+    def refresh(self, entry: dict[str, Any], headers: Mapping[str, str]) -> None:
+        """Update the freshness of a revalidated `entry`, from response `headers`."""
+        entry = {
+            **entry,
+            "etag": headers.get("ETag", entry["etag"]),
+            "last_modified": headers.get("Last-Modified", entry["last_modified"]),
+        }
+        self._write(entry, headers)
+
+    def evict(self) -> int:
+        """Remove least recently used documents above `max_size`, return freed bytes."""
+        if self.max_size is None or not self.path.is_dir():
+            return 0
+
+        entries = []
+        total_size = 0
+        for prefix_dir in os.scandir(self.path):
+            for entry in os.scandir(prefix_dir.path):
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+                total_size += entry_stat.st_size
+
+        freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total_size - freed <= self.max_size:
+                break
+            Path(path).unlink(missing_ok=True)
+            freed += size
+
+        if freed:
+            logger.info("STAC cache: evicted %d bytes", freed)
+        return freed
+
+    def _write(self, entry: dict[str, Any], headers: Mapping[str, str]) -> None:
+        """Write `entry` with the freshness of `headers`, unless not storable."""
+        directives = _cache_control(headers.get("Cache-Control", ""))
+        entry_path = self.entry_path(entry["href"])
+        if "no-store" in directives or not (
+            entry["etag"] or entry["last_modified"] or "max-age" in directives
+        ):
+            # Nothing to revalidate with, nor to use the document without request.
+            entry_path.unlink(missing_ok=True)
+            return
+        max_age = 0.0
+        if "no-cache" not in directives:
+            with contextlib.suppress(ValueError):
+                max_age = min(float(directives.get("max-age") or 0), self.ttl)
+        entry["fresh_until"] = time.time() + max_age
+
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temporary file, the same document may be read concurrently.
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps(entry))
+        tmp_path.replace(entry_path)
+
+
+def _cache_control(value: str) -> dict[str, str | None]:
+    """Parse a `Cache-Control` header, directives by lowercase name.
+
+    >>> _cache_control("public, max-age=600, no-cache")
+    {'public': None, 'max-age': '600', 'no-cache': None}
+    """
+    directives: dict[str, str | None] = {}
+    for directive in value.split(","):
+        name, sep, arg = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if sep else None
+    return directives
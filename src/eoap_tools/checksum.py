@@ -0,0 +1,206 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools checksum module.
+
+Checksums are multihash hex strings, as used by the STAC `file` extension.
+"""
+
+import hashlib
+import logging
+import shutil
+from pathlib import Path
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024**2
+DEFAULT_ALGORITHM = "sha2-256"
+
+# Multihash codes (https://github.com/multiformats/multicodec) and their
+# hashlib constructors arguments.
+_ALGORITHMS: dict[str, tuple[int, str, int | None]] = {
+    "sha1": (0x11, "sha1", None),
+    "sha2-256": (0x12, "sha256", None),
+    "sha2-512": (0x13, "sha512", None),
+    "sha3-512": (0x14, "sha3_512", None),
+    "sha3-256": (0x16, "sha3_256", None),
+    "md5": (0xD5, "md5", None),
+    "blake2b-256": (0xB220, "blake2b", 32),
+    "blake2b-512": (0xB240, "blake2b", 64),
+}
+_CODES = {code: name for name, (code, _, _) in _ALGORITHMS.items()}
+
+
+class HashObject(Protocol):
+    """Hash object, as returned by `hashlib` constructors."""
+
+    @property
+    def name(self) -> str:
+        """Name of the hash algorithm."""
+
+    @property
+    def digest_size(self) -> int:
+        """Size of the digest in bytes."""
+
+    def update(self, data: bytes, /) -> None:
+        """Update the hash with `data`."""
+
+    def digest(self) -> bytes:
+        """Return the digest of the data passed so far."""
+
+
+class ChecksumError(Exception):
+    """Checksum or size mismatch."""
+
+
+def new_hash(algorithm: str = DEFAULT_ALGORITHM) -> HashObject:
+    """Return a new hash object for the multihash `algorithm` name."""
+    try:
+        _, name, digest_size = _ALGORITHMS[algorithm]
+    except KeyError:
+        msg = f"unsupported checksum algorithm: {algorithm}"
+        raise ValueError(msg) from None
+    if digest_size:
+        return hashlib.blake2b(digest_size=digest_size)
+    return hashlib.new(name)
+
+
+def encode_multihash(algorithm: str, digest: bytes) -> str:
+    """Encode `digest` as a multihash hex string.
+
+    >>> encode_multihash("sha2-256", bytes(32))[:6]
+    '122000'
+    >>> encode_multihash("md5", bytes(16))[:8]
+    'd5011000'
+    """
+    code = _ALGORITHMS[algorithm][0]
+    return (_encode_varint(code) + _encode_varint(len(digest)) + digest).hex()
+
+
+def decode_multihash(checksum: str) -> tuple[str, bytes]:
+    """Decode a multihash hex string to its algorithm name and digest.
+
+    >>> decode_multihash("1220" + "ab" * 32)[0]
+    'sha2-256'
+    """
+    try:
+        data = bytes.fromhex(checksum)
+        code, offset = _decode_varint(data, 0)
+        length, offset = _decode_varint(data, offset)
+    except (ValueError, IndexError):
+        msg = f"invalid multihash: {checksum}"
+        raise ValueError(msg) from None
+    digest = data[offset:]
+    if code not in _CODES or len(digest) != length:
+        msg = f"invalid or unsupported multihash: {checksum}"
+        raise ValueError(msg)
+    return _CODES[code], digest
+
+
+def checksum_algorithm(checksum: str | None) -> str:
+    """Return the algorithm of `checksum`, the default one if None."""
+    if checksum is None:
+        return DEFAULT_ALGORITHM
+    return decode_multihash(checksum)[0]
+
+
+def supported_checksum(checksum: str | None) -> str | None:
+    """Return `checksum`, or None with a warning if it cannot be verified.
+
+    >>> supported_checksum("1e20" + "ab" * 32) is None
+    True
+    """
+    if checksum is None:
+        return None
+    try:
+        decode_multihash(checksum)
+    except ValueError as e:
+        logger.warning("%s, checksum not verified", e)
+        return None
+    return checksum
+
+
+def multihash(hash_obj: HashObject) -> str:
+    """Return the multihash of a hash object created by `new_hash`."""
+    for algorithm, (_, name, digest_size) in _ALGORITHMS.items():
+        if name == hash_obj.name and digest_size in (None, hash_obj.digest_size):
+            return encode_multihash(algorithm, hash_obj.digest())
+    msg = f"unsupported hash: {hash_obj.name}"
+    raise ValueError(msg)
+
+
+def file_checksum(path: Path, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """Return the multihash checksum of the file at `path`."""
+    hash_obj = new_hash(algorithm)
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            hash_obj.update(chunk)
+    return multihash(hash_obj)
+
+
+def copy_file(src: Path, dst: Path, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """Copy `src` to `dst` and return the checksum computed while copying."""
+    hash_obj = new_hash(algorithm)
+    with src.open("rb") as fsrc, dst.open("wb") as fdst:
+        while chunk := fsrc.read(CHUNK_SIZE):
+            hash_obj.update(chunk)
+            fdst.write(chunk)
+    shutil.copymode(src, dst)
+    return multihash(hash_obj)
+
+
+def verify(
+    path: Path, checksum: str | None, size: int | None, computed: str | None = None
+) -> None:
+    """Raise `ChecksumError` if the file at `path` doesn't match `checksum`/`size`.
+
+    The file is hashed unless its `computed` checksum is given. An unsupported
+    `checksum` is not verified.
+    """
+    checksum = supported_checksum(checksum)
+    if size is not None and path.stat().st_size != size:
+        msg = f"size mismatch for {path}: {path.stat().st_size} != {size}"
+        raise ChecksumError(msg)
+    if checksum is None:
+        return
+    if computed is None:
+        computed = file_checksum(path, checksum_algorithm(checksum))
+    if computed.lower() != checksum.lower():
+        msg = f"checksum mismatch for {path}: {computed} != {checksum}"
+        raise ChecksumError(msg)
+
+
+def _encode_varint(value: int) -> bytes:
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+def _decode_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
@@ -0,0 +1,29 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools default settings.
+
+This module has no dependency, so that the CLI can use it without importing the
+modules doing the actual work.
+"""
+
+DEFAULT_JOBS = 4
+DEFAULT_SEGMENT_SIZE = 64 * 1024**2
+DEFAULT_SEGMENTS = 4
+DEFAULT_POOL_SIZE = 32
+DEFAULT_RETRIES = 5
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_STAC_CACHE_TTL = 24 * 3600.0
+DEFAULT_SEARCH_PAGE_SIZE = 100
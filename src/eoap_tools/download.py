@@ -0,0 +1,541 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools download module."""
+
+import email.utils
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, cast
+
+import requests
+
+from eoap_tools.checksum import (
+    ChecksumError,
+    checksum_algorithm,
+    multihash,
+    new_hash,
+    supported_checksum,
+    verify,
+)
+from eoap_tools.defaults import DEFAULT_SEGMENT_SIZE, DEFAULT_SEGMENTS
+from eoap_tools.metrics import count
+from eoap_tools.session import get_session
+from eoap_tools.utils import is_s3, preallocate
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024**2
+
+_CONTENT_RANGE_REGEX = re.compile(r"bytes (?P<start>\d+)-(?P<end>\d+)/(?P<size>\d+)")
+_UNSATISFIED_RANGE_REGEX = re.compile(r"bytes \*/(?P<size>\d+)")
+
+
+@dataclass(frozen=True)
+class TransferOptions:
+    """Options of a single asset transfer."""
+
+    segment_size: int = DEFAULT_SEGMENT_SIZE
+    """Size of the byte ranges fetched by a segmented download."""
+    segments: int = DEFAULT_SEGMENTS
+    """Number of byte ranges fetched in parallel, 1 disables segmented download."""
+    resume: bool = False
+    """Keep partial downloads on failure and resume them on the next run."""
+    verify: bool = True
+    """Check transfers against the expected checksum and size when known."""
+    link_mode: str = "copy"
+    """How local files are materialized, see `eoap_tools.utils.link_file`."""
+    extract: bool = False
+    """Extract archives in a directory while reading them, see `eoap_tools.extract`."""
+    sync: bool = False
+    """Only transfer assets missing or outdated on disk, see `prepare_assets`."""
+
+
+class DownloadError(Exception):
+    """Download failure."""
+
+
+@dataclass
+class _PartialState:
+    """State of a partial download, saved next to the `.part` file."""
+
+    href: str
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int | None = None
+    segment_size: int | None = None
+    segments_done: list[int] = field(default_factory=list)
+
+    @property
+    def validator(self) -> str | None:
+        """Validator of the remote file version, for `If-Range` requests."""
+        return self.etag or self.last_modified
+
+    @classmethod
+    def from_response(
+        cls, response: requests.Response, size: int | None = None
+    ) -> "_PartialState":
+        """Create state from the first response of a download."""
+        if size is None and "Content-Length" in response.headers:
+            size = int(response.headers["Content-Length"])
+        return cls(
+            href=response.request.url or "",
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            size=size,
+        )
+
+
+def download_file(
+    href: str,
+    dest_path: Path,
+    options: TransferOptions,
+    checksum: str | None = None,
+    size: int | None = None,
+) -> str | None:
+    """Download `href` to `dest_path`.
+
+    If the server supports range requests and the file is larger than one segment,
+    byte ranges are fetched in parallel and written at their offset in the
+    preallocated destination file. Otherwise the file is downloaded in one stream.
+
+    Data is written to a `.part` file renamed to `dest_path` once complete. With
+    `options.resume`, the partial file and its state are kept on failure, and an
+    existing partial file of the same remote version is completed with range
+    requests instead of being downloaded again.
+
+    With `options.verify` and an expected multihash `checksum`, the file is hashed
+    while downloading and the computed checksum is returned. A file not matching
+    `checksum` or `size` raises `ChecksumError` and is removed. An invalid or
+    unsupported `checksum` is not verified, with a warning.
+
+    `s3://` hrefs are downloaded by `eoap_tools.s3.download_s3`.
+    """
+    if is_s3(href):
+        from eoap_tools.s3 import download_s3  # noqa: PLC0415
+
+        return download_s3(href, dest_path, options, checksum, size)
+    if not options.verify:
+        checksum = size = None
+    checksum = supported_checksum(checksum)
+    download = _Download(href, dest_path, options, checksum, size)
+    try:
+        return download.run()
+    except BaseException:
+        if not options.resume:
+            download.part_path.unlink(missing_ok=True)
+        raise
+
+
+def is_downloaded(
+    href: str, dest_path: Path, checksum: str | None = None, size: int | None = None
+) -> bool:
+    """Return True if `dest_path` is a complete download of `href`.
+
+    The file is compared to `checksum` if given, otherwise its size is compared to
+    `size` if given, or to the remote `Content-Length`.
+    """
+    if not dest_path.is_file():
+        return False
+    checksum = supported_checksum(checksum)
+    if checksum:
+        try:
+            verify(dest_path, checksum, size)
+        except ChecksumError as e:
+            logger.info("%s", e)
+            return False
+        return True
+    if size is None:
+        size = _remote_size(href)
+    return size is not None and dest_path.stat().st_size == size
+
+
+def _remote_size(href: str) -> int | None:
+    if is_s3(href):
+        from eoap_tools.s3 import head_s3, s3_errors  # noqa: PLC0415
+
+        try:
+            return int(head_s3(href)["ContentLength"])
+        except s3_errors() as e:
+            logger.debug("cannot check remote size of %s: %s", href, e)
+            return None
+    try:
+        response = get_session().head(href, allow_redirects=True)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.debug("cannot check remote size of %s: %s", href, e)
+        return None
+    if "Content-Length" not in response.headers:
+        return None
+    return int(response.headers["Content-Length"])
+
+
+def remote_version(href: str) -> str | None:
+    """Return the version of the remote file from its `ETag` or `Last-Modified`."""
+    if is_s3(href):
+        from eoap_tools.s3 import head_s3, s3_errors  # noqa: PLC0415
+
+        try:
+            return str(head_s3(href)["ETag"])
+        except s3_errors() as e:
+            logger.debug("cannot get remote version of %s: %s", href, e)
+            return None
+    try:
+        response = get_session().head(href, allow_redirects=True)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.debug("cannot get remote version of %s: %s", href, e)
+        return None
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    if "Last-Modified" in response.headers:
+        length = response.headers.get("Content-Length", "")
+        return f"{response.headers['Last-Modified']}/{length}"
+    return None
+
+
+def remote_validators(
+    href: str, previous: dict[str, Any] | None = None
+) -> dict[str, Any] | None:
+    """Return the `etag`, `last_modified` and `size` of the remote file.
+
+    The validators are read with a HEAD request, conditional with the validators
+    of a `previous` download, and `previous` is returned if the remote file was not
+    modified. Returns None if the request failed.
+    """
+    if is_s3(href):
+        from eoap_tools.s3 import head_s3, s3_errors  # noqa: PLC0415
+
+        try:
+            head = head_s3(href)
+        except s3_errors() as e:
+            logger.debug("cannot get remote validators of %s: %s", href, e)
+            return None
+        return {
+            "etag": head["ETag"],
+            "last_modified": email.utils.format_datetime(
+                head["LastModified"], usegmt=True
+            ),
+            "size": int(head["ContentLength"]),
+        }
+
+    headers = {}
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous and previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    try:
+        response = get_session().head(href, headers=headers, allow_redirects=True)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.debug("cannot get remote validators of %s: %s", href, e)
+        return None
+    if previous and response.status_code == requests.codes.not_modified:
+        return previous
+    length = response.headers.get("Content-Length")
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "size": int(length) if length is not None else None,
+    }
+
+
+class _Download:
+    """Download of a file through a `.part` file, with optional resume state."""
+
+    def __init__(
+        self,
+        href: str,
+        dest_path: Path,
+        options: TransferOptions,
+        checksum: str | None,
+        size: int | None,
+    ) -> None:
+        self.href = href
+        self.dest_path = dest_path
+        self.options = options
+        self.checksum = checksum
+        self.size = size
+        self.part_path = dest_path.with_name(f"{dest_path.name}.part")
+        self.state_path = dest_path.with_name(f"{dest_path.name}.part.json")
+        self.state: _PartialState | None = None
+        self._state_lock = threading.Lock()
+        self.hash_obj = new_hash(checksum_algorithm(checksum)) if checksum else None
+        self._hash_lock = threading.Lock()
+        self._hashed_segments = 0
+
+    def run(self) -> str | None:
+        previous_state = self._load_state() if self.options.resume else None
+        if previous_state and not previous_state.validator:
+            logger.info("partial download cannot be validated: %s", self.part_path)
+            previous_state = None
+        if previous_state and previous_state.segment_size is None:
+            self._resume_stream(previous_state)
+        elif self.options.segments > 1:
+            self._download_segmented(previous_state)
+        else:
+            response = self._get()
+            self._set_state(_PartialState.from_response(response))
+            self._write_stream(response, offset=0)
+
+        computed = multihash(self.hash_obj) if self.hash_obj else None
+        try:
+            verify(self.part_path, self.checksum, self.size, computed=computed)
+        except ChecksumError:
+            self.part_path.unlink(missing_ok=True)
+            self.state_path.unlink(missing_ok=True)
+            raise
+        self.part_path.replace(self.dest_path)
+        self.state_path.unlink(missing_ok=True)
+        return computed
+
+    def _get(self, headers: dict[str, str] | None = None) -> requests.Response:
+        response = get_session().get(self.href, headers=headers, stream=True)
+        response.raise_for_status()
+        return response
+
+    def _resume_stream(self, state: _PartialState) -> None:
+        offset = self.part_path.stat().st_size
+        if offset == state.size:
+            logger.info("partial download already complete: %s", self.part_path)
+            self._hash_part()
+            return
+
+        logger.info("resume download at byte %d: %s", offset, self.href)
+        headers = {"Range": f"bytes={offset}-"}
+        if state.validator:
+            headers["If-Range"] = state.validator
+        response = get_session().get(self.href, headers=headers, stream=True)
+        if response.status_code == requests.codes.requested_range_not_satisfiable:
+            response.close()
+            self._resume_unsatisfiable(response, offset)
+            return
+        response.raise_for_status()
+        content_range = _parse_content_range(response)
+        if content_range and int(content_range["start"]) == offset:
+            self.state = state
+            self._write_stream(response, offset=offset)
+        elif response.status_code == requests.codes.ok:
+            logger.info("remote file changed, download from start: %s", self.href)
+            self._set_state(_PartialState.from_response(response))
+            self._write_stream(response, offset=0)
+        else:
+            response.close()
+            msg = f"unexpected response to resume request: {response.status_code}"
+            raise DownloadError(msg)
+
+    def _resume_unsatisfiable(self, response: requests.Response, offset: int) -> None:
+        """Finalize a partial download of the remote size, otherwise restart it."""
+        unsatisfied = _UNSATISFIED_RANGE_REGEX.fullmatch(
+            response.headers.get("Content-Range", "")
+        )
+        if unsatisfied and int(unsatisfied["size"]) == offset:
+            logger.info("partial download already complete: %s", self.part_path)
+            self._hash_part()
+            return
+        logger.info("partial download cannot be resumed, restart: %s", self.href)
+        self.part_path.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+        response = self._get()
+        self._set_state(_PartialState.from_response(response))
+        self._write_stream(response, offset=0)
+
+    def _hash_part(self) -> None:
+        if self.hash_obj:
+            with self.part_path.open("rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    self.hash_obj.update(chunk)
+
+    def _download_segmented(self, previous_state: _PartialState | None) -> None:
+        segment_size = self.options.segment_size
+        if previous_state and previous_state.segment_size != segment_size:
+            previous_state = None
+
+        # The first segment is requested directly, a server ignoring the range
+        # answers the whole content and the download falls back to one stream.
+        headers = {"Range": f"bytes=0-{segment_size - 1}"}
+        if previous_state and previous_state.validator:
+            headers["If-Range"] = previous_state.validator
+        response = get_session().get(self.href, headers=headers, stream=True)
+        if response.status_code == requests.codes.requested_range_not_satisfiable:
+            # An empty file has no byte range to request.
+            response.close()
+            logger.debug("range not satisfiable, download in one stream: %s", self.href)
+            response = self._get()
+        response.raise_for_status()
+        content_range = _parse_content_range(response)
+        if not content_range:
+            logger.debug("range requests not supported: %s", self.href)
+            self._set_state(_PartialState.from_response(response))
+            self._write_stream(response, offset=0)
+            return
+
+        size = int(content_range["size"])
+        if size <= segment_size:
+            self._set_state(_PartialState.from_response(response, size=size))
+            self._write_stream(response, offset=0)
+            return
+
+        if previous_state and previous_state.size == size:
+            state = previous_state
+            logger.info(
+                "resume segmented download (%d/%d segments done): %s",
+                len(state.segments_done),
+                -(-size // segment_size),
+                self.href,
+            )
+        else:
+            state = _PartialState.from_response(response, size=size)
+            state.segment_size = segment_size
+            with self.part_path.open("wb") as f:
+                preallocate(f.fileno(), size)
+        self._set_state(state)
+
+        logger.debug("segmented download (%d bytes): %s", size, self.href)
+        self._fetch_segments(response, state)
+
+    def _fetch_segments(
+        self, first_response: requests.Response, state: _PartialState
+    ) -> None:
+        size = cast("int", state.size)
+        segment_size = cast("int", state.segment_size)
+        if 0 in state.segments_done:
+            first_response.close()
+        with (
+            self.part_path.open("r+b") as f,
+            ThreadPoolExecutor(
+                max_workers=self.options.segments, thread_name_prefix="segment"
+            ) as executor,
+        ):
+            futures = []
+            for index, start in enumerate(range(0, size, segment_size)):
+                end = min(start + segment_size, size) - 1
+                if index in state.segments_done:
+                    continue
+                if index == 0:
+                    future = executor.submit(
+                        self._write_segment, first_response, f.fileno(), 0, start, end
+                    )
+                else:
+                    future = executor.submit(
+                        self._download_segment, f.fileno(), index, start, end
+                    )
+                futures.append(future)
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+            self._hash_segments(f.fileno())
+
+    def _download_segment(self, fd: int, index: int, start: int, end: int) -> None:
+        headers = {"Range": f"bytes={start}-{end}"}
+        if self.state and self.state.validator:
+            headers["If-Range"] = self.state.validator
+        response = self._get(headers)
+        content_range = _parse_content_range(response)
+        if not content_range or int(content_range["start"]) != start:
+            response.close()
+            msg = f"invalid range response for bytes {start}-{end} (changed remotely?)"
+            raise DownloadError(msg)
+        self._write_segment(response, fd, index, start, end)
+
+    def _write_segment(
+        self, response: requests.Response, fd: int, index: int, start: int, end: int
+    ) -> None:
+        written = 0
+        with response:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                written += os.pwrite(fd, chunk, start + written)
+                count("bytes_downloaded", len(chunk))
+        if written != end - start + 1:
+            msg = f"incomplete range at offset {start}: {written} bytes"
+            raise DownloadError(msg)
+
+        with self._state_lock:
+            if self.state:
+                self.state.segments_done.append(index)
+                self._save_state()
+        self._hash_segments(fd)
+
+    def _hash_segments(self, fd: int) -> None:
+        """Hash completed segments in order, as they are still in page cache."""
+        if not (self.hash_obj and self.state and self.state.segment_size):
+            return
+        segment_size = self.state.segment_size
+        with self._hash_lock:
+            while True:
+                with self._state_lock:
+                    if self._hashed_segments not in self.state.segments_done:
+                        return
+                offset = self._hashed_segments * segment_size
+                end = offset + segment_size
+                while offset < end and (
+                    chunk := os.pread(fd, min(CHUNK_SIZE, end - offset), offset)
+                ):
+                    self.hash_obj.update(chunk)
+                    offset += len(chunk)
+                self._hashed_segments += 1
+
+    def _write_stream(self, response: requests.Response, offset: int) -> None:
+        with response, self.part_path.open("r+b" if offset else "wb") as f:
+            f.truncate(offset)
+            if self.hash_obj:
+                while f.tell() < offset and (chunk := f.read(CHUNK_SIZE)):
+                    self.hash_obj.update(chunk)
+            f.seek(offset)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if self.hash_obj:
+                    self.hash_obj.update(chunk)
+                f.write(chunk)
+                count("bytes_downloaded", len(chunk))
+
+    def _set_state(self, state: _PartialState) -> None:
+        state.href = self.href
+        self.state = state
+        self._save_state()
+
+    def _save_state(self) -> None:
+        if not (self.options.resume and self.state):
+            return
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(self.state)))
+        tmp_path.replace(self.state_path)
+
+    def _load_state(self) -> _PartialState | None:
+        if not (self.part_path.is_file() and self.state_path.is_file()):
+            return None
+        try:
+            data: dict[str, Any] = json.loads(self.state_path.read_text())
+            state = _PartialState(**data)
+        except (ValueError, TypeError) as e:
+            logger.warning("invalid partial download state %s: %s", self.state_path, e)
+            return None
+        if state.href != self.href:
+            return None
+        return state
+
+
+def _parse_content_range(response: requests.Response) -> re.Match[str] | None:
+    if response.status_code != requests.codes.partial_content:
+        return None
+    return _CONTENT_RANGE_REGEX.fullmatch(response.headers.get("Content-Range", ""))
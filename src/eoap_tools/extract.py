@@ -0,0 +1,309 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools archive extraction module.
+
+Archives are extracted while they are read, without writing the archive itself:
+tar archives are decompressed from the download stream, zip archives are read
+with byte range requests of their central directory and members.
+"""
+
+import io
+import logging
+import re
+import shutil
+import tarfile
+import tempfile
+import urllib.parse
+import zipfile
+from collections.abc import Buffer, Iterator
+from pathlib import Path
+from typing import IO, cast
+
+import requests
+
+from eoap_tools.checksum import (
+    ChecksumError,
+    HashObject,
+    checksum_algorithm,
+    multihash,
+    new_hash,
+    supported_checksum,
+)
+from eoap_tools.metrics import count
+from eoap_tools.session import get_session
+from eoap_tools.utils import is_url
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024**2
+ZIP_READ_SIZE = 8 * 1024**2
+"""Size of the byte ranges read from a remote zip archive."""
+
+_CONTENT_RANGE_REGEX = re.compile(r"bytes (?P<start>\d+)-(?P<end>\d+)/(?P<size>\d+)")
+
+ARCHIVE_FORMATS = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tar.xz": "xz",
+    ".tar.zst": "zst",
+    ".tzst": "zst",
+}
+"""Archive formats by file suffix, tar compressions for tar archives."""
+
+
+class ExtractError(Exception):
+    """Archive extraction failure."""
+
+
+def archive_format(href: str) -> str | None:
+    """Return the archive format of `href` from its suffix, None if not an archive.
+
+    >>> archive_format("https://example.com/S2A_MSIL1C.SAFE.zip?token=x")
+    'zip'
+    >>> archive_format("product.tar.gz")
+    'gz'
+    >>> archive_format("B02.tif") is None
+    True
+    """
+    path = urllib.parse.urlparse(href).path if is_url(href) else href
+    path = path.lower()
+    for suffix, archive in ARCHIVE_FORMATS.items():
+        if path.endswith(suffix):
+            return archive
+    return None
+
+
+def extract_archive(
+    href: str, dest_path: Path, checksum: str | None = None, size: int | None = None
+) -> int:
+    """Extract the archive at `href` into directory `dest_path`, return its size.
+
+    Tar archives, optionally compressed with gzip, bzip2, xz or zstd (requires the
+    `zstd` extra), are extracted from one stream. They are hashed while read, and
+    archives not matching `checksum` or `size` raise `ChecksumError`. An invalid or
+    unsupported `checksum` is not verified, with a warning.
+
+    Remote zip archives are read with byte range requests, members in the order
+    of their data. Members are checked against their CRC-32, but the archive as
+    a whole is not read and not checked against `checksum` and `size`.
+
+    Members are extracted to `<dest_path>.part`, renamed to `dest_path` once done.
+    """
+    archive = archive_format(href)
+    if archive is None:
+        msg = f"unsupported archive format: {href}"
+        raise ExtractError(msg)
+    checksum = supported_checksum(checksum)
+    part_path = dest_path.with_name(f"{dest_path.name}.part")
+    shutil.rmtree(part_path, ignore_errors=True)
+    part_path.mkdir(parents=True)
+    try:
+        if archive == "zip":
+            _extract_zip(href, part_path)
+        else:
+            _extract_tar(href, archive, part_path, checksum, size)
+    except BaseException:
+        shutil.rmtree(part_path, ignore_errors=True)
+        raise
+    if dest_path.is_dir() and not dest_path.is_symlink():
+        shutil.rmtree(dest_path)
+    else:
+        dest_path.unlink(missing_ok=True)
+    part_path.replace(dest_path)
+    extracted = sum(p.stat().st_size for p in dest_path.rglob("*") if p.is_file())
+    count("bytes_extracted", extracted)
+    return extracted
+
+
+def _extract_tar(
+    href: str,
+    compression: str,
+    path: Path,
+    checksum: str | None,
+    size: int | None,
+) -> None:
+    """Extract a tar archive from one stream."""
+    if is_url(href):
+        response = get_session().get(href, stream=True)
+        response.raise_for_status()
+        raw: IO[bytes] = cast("IO[bytes]", _IterReader(_iter_response(response)))
+    else:
+        raw = Path(href).open("rb")  # noqa: SIM115
+    hash_obj = new_hash(checksum_algorithm(checksum)) if checksum else None
+    reader = _HashReader(raw, hash_obj)
+    with raw, reader:
+        stream: IO[bytes] = cast("IO[bytes]", reader)
+        mode = f"r|{compression}"
+        if compression == "zst":
+            stream = _zstd_reader(stream)
+            mode = "r|"
+        with tarfile.open(fileobj=stream, mode=mode) as tar:  # type: ignore[call-overload]
+            tar.extractall(path, filter="data")
+        # Read the end of the archive, so that it is fully hashed and sized.
+        while reader.read(CHUNK_SIZE):
+            pass
+
+    if size is not None and reader.size != size:
+        msg = f"size mismatch for {href}: {reader.size} != {size}"
+        raise ChecksumError(msg)
+    if checksum and hash_obj and multihash(hash_obj).lower() != checksum.lower():
+        msg = f"checksum mismatch for {href}: {multihash(hash_obj)} != {checksum}"
+        raise ChecksumError(msg)
+
+
+def _zstd_reader(stream: IO[bytes]) -> IO[bytes]:
+    try:
+        import zstandard  # noqa: PLC0415
+    except ImportError as e:
+        msg = "zstd archives require the zstandard package"
+        raise ExtractError(msg) from e
+    return cast("IO[bytes]", zstandard.ZstdDecompressor().stream_reader(stream))
+
+
+def _extract_zip(href: str, path: Path) -> None:
+    """Extract a zip archive, members in the order of their data."""
+    with _open_zip(href, path) as raw, zipfile.ZipFile(raw) as archive:
+        for info in sorted(archive.infolist(), key=lambda i: i.header_offset):
+            archive.extract(info, path)
+
+
+def _open_zip(href: str, path: Path) -> IO[bytes]:
+    """Open a zip archive, remote ones are seekable through byte range requests.
+
+    A remote archive is spooled to a temporary file in `path` if the server does
+    not support range requests.
+    """
+    if not is_url(href):
+        return Path(href).open("rb")
+    response = get_session().get(href, headers={"Range": "bytes=0-0"}, stream=True)
+    response.raise_for_status()
+    match = _CONTENT_RANGE_REGEX.fullmatch(response.headers.get("Content-Range", ""))
+    if response.status_code == requests.codes.partial_content and match:
+        response.close()
+        validator = response.headers.get("ETag") or response.headers.get(
+            "Last-Modified"
+        )
+        reader = _RangeReader(href, int(match["size"]), validator)
+        return io.BufferedReader(reader, ZIP_READ_SIZE)
+
+    logger.info("range requests not supported, spooling archive: %s", href)
+    spool = tempfile.TemporaryFile(dir=path)  # noqa: SIM115
+    for chunk in _iter_response(response):
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _iter_response(response: requests.Response) -> Iterator[bytes]:
+    with response:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            count("bytes_downloaded", len(chunk))
+            yield chunk
+
+
+class _IterReader(io.RawIOBase):
+    """Readable binary stream of an iterator of chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = chunk
+        view = memoryview(buffer).cast("B")
+        size = min(len(view), len(self._buffer))
+        view[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class _HashReader(io.RawIOBase):
+    """Readable binary stream hashing and counting the bytes read from `raw`."""
+
+    def __init__(self, raw: IO[bytes], hash_obj: HashObject | None) -> None:
+        self._raw = raw
+        self._hash_obj = hash_obj
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self._raw.read(len(view))
+        size = len(data)
+        view[:size] = data
+        if self._hash_obj:
+            self._hash_obj.update(data)
+        self.size += size
+        return size
+
+
+class _RangeReader(io.RawIOBase):
+    """Seekable binary stream of a remote file, read with byte range requests."""
+
+    def __init__(self, href: str, size: int, validator: str | None) -> None:
+        self.href = href
+        self.size = size
+        self._validator = validator
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, buffer: Buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        end = min(self._position + len(view), self.size) - 1
+        if end < self._position:
+            return 0
+        headers = {"Range": f"bytes={self._position}-{end}"}
+        if self._validator:
+            headers["If-Range"] = self._validator
+        # Streamed, so that a whole content answered instead is not read.
+        with get_session().get(self.href, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            if response.status_code != requests.codes.partial_content:
+                msg = f"invalid range response (changed remotely?): {self.href}"
+                raise ExtractError(msg)
+            data = response.content
+        size = len(data)
+        view[:size] = data
+        self._position += size
+        count("bytes_downloaded", size)
+        return size
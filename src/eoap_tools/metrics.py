@@ -0,0 +1,135 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools metrics module.
+
+Performance metrics of a run, collected by the other modules: time spent in each
+phase, counters (bytes moved, retries, cache hits...), per-asset transfers and
+peak memory. Collection is cheap and always on, the CLI writes the report as
+JSON with `--metrics-file`.
+"""
+
+import contextlib
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+
+class Metrics:
+    """Thread-safe collector of performance metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the metrics, to collect the metrics of a new run."""
+        with self._lock:
+            self.command: str | None = None
+            self.start = time.perf_counter()
+            self.phases: dict[str, list[float]] = {}
+            self.counters: Counter[str] = Counter()
+            self.transfers: list[dict[str, Any]] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed code as phase `name`, which may run many times.
+
+        Also usable as a function decorator.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.phases.setdefault(name, []).append(duration)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add `value` to counter `name`."""
+        with self._lock:
+            self.counters[name] += value
+
+    def add_transfer(self, name: str, duration: float, size: int | None) -> None:
+        """Record the transfer of asset `name`."""
+        with self._lock:
+            self.transfers.append({"name": name, "seconds": duration, "bytes": size})
+
+    def report(self) -> dict[str, Any]:
+        """Return the metrics report, a JSON serializable dict."""
+        duration = time.perf_counter() - self.start
+        with self._lock:
+            phases = {
+                name: {
+                    "count": len(durations),
+                    "seconds": sum(durations),
+                    "max_seconds": max(durations),
+                }
+                for name, durations in sorted(self.phases.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+            transfers = list(self.transfers)
+        # Bytes per second of each bytes counter over the whole run.
+        throughput = {
+            name: value / duration
+            for name, value in counters.items()
+            if name.startswith("bytes_") and duration
+        }
+        return {
+            "command": self.command,
+            "seconds": duration,
+            "phases": phases,
+            "counters": counters,
+            "throughput": throughput,
+            "peak_rss": _peak_rss(resource.RUSAGE_SELF) if resource else None,
+            "peak_rss_children": (
+                _peak_rss(resource.RUSAGE_CHILDREN) if resource else None
+            ),
+            "transfers": transfers,
+        }
+
+    def write_report(self, path: Path) -> None:
+        """Write the metrics report to `path` as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2) + "\n")
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the metrics of the current run."""
+    return _metrics
+
+
+# Shortcuts to time phases and count in the metrics of the current run.
+phase = _metrics.phase
+count = _metrics.count
+
+
+def _peak_rss(who: int) -> int:
+    """Return the peak resident set size of `who` in bytes."""
+    max_rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
@@ -0,0 +1,149 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools profiling module.
+
+Profile of a whole run, enabled by the CLI `--profile` option: cProfile stats,
+or collapsed stacks sampled from every thread, and optionally the top memory
+allocators traced by tracemalloc.
+"""
+
+import cProfile
+import logging
+import re
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+COLLAPSED_SUFFIXES = (".collapsed", ".folded")
+"""Profile file suffixes selecting the collapsed stacks format."""
+TRACEMALLOC_FRAMES = 10
+"""Number of frames stored by tracemalloc for each allocation."""
+
+
+class Profiler:
+    """Profiler of a run, writing its profile to `path` when stopped.
+
+    With a `path` suffix in `COLLAPSED_SUFFIXES`, the stacks of every thread are
+    sampled each `interval` seconds and written in collapsed format ("frame;frame
+    count" lines, root first, rooted at the thread pool name), as read by flame
+    graph tools. Otherwise, cProfile stats are written, to be read with `pstats`
+    or `snakeviz`.
+
+    With `memory`, allocations are traced and the `top` allocating lines written
+    to `<path>.memory.txt`.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        memory: bool = False,
+        interval: float = 0.005,
+        top: int = 25,
+    ) -> None:
+        self.path = path
+        self.memory = memory
+        self.interval = interval
+        self.top = top
+        self._profile: cProfile.Profile | None = None
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    @property
+    def collapsed(self) -> bool:
+        """Whether collapsed stacks are written, rather than cProfile stats."""
+        return self.path.suffix in COLLAPSED_SUFFIXES
+
+    def start(self) -> None:
+        """Start profiling."""
+        if self.memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        if self.collapsed:
+            self._sampler = threading.Thread(
+                target=self._sample, name="profiler", daemon=True
+            )
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop profiling and write the profile."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._profile:
+            self._profile.disable()
+            self._profile.dump_stats(self.path)
+        if self._sampler:
+            self._stop.set()
+            self._sampler.join()
+            with self.path.open("w") as f:
+                f.writelines(
+                    f"{stack} {count}\n" for stack, count in self._stacks.items()
+                )
+        logger.info("profile written to: %s", self.path)
+        if self.memory:
+            self._write_memory()
+
+    def _sample(self) -> None:
+        """Count the current stack of every other thread, until stopped."""
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+                if thread_id != own_id:
+                    name = _thread_group(names.get(thread_id, "thread"))
+                    self._stacks[";".join([name, *_frames(frame)])] += 1
+
+    def _write_memory(self) -> None:
+        """Write the top allocating lines, and stop tracing allocations."""
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+        )
+        stats = snapshot.statistics("lineno")[: self.top]
+        memory_path = self.path.with_name(f"{self.path.name}.memory.txt")
+        with memory_path.open("w") as f:
+            f.write(f"Peak traced memory: {peak} bytes\n")
+            f.write(f"Top {len(stats)} allocating lines:\n")
+            f.writelines(f"{stat}\n" for stat in stats)
+        logger.info("memory allocations written to: %s", memory_path)
+
+
+def _thread_group(name: str) -> str:
+    """Name of a thread without its index in a pool.
+
+    >>> _thread_group("asset_3")
+    'asset'
+    >>> _thread_group("MainThread")
+    'MainThread'
+    """
+    return re.sub(r"[_-]\d+$", "", name)
+
+
+def _frames(frame: FrameType | None) -> list[str]:
+    """Return the functions of the stack of `frame`, root first."""
+    frames = []
+    while frame:
+        code = frame.f_code
+        frames.append(f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return frames[::-1]
@@ -0,0 +1,268 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools S3 module.
+
+Downloads of `s3://bucket/key` hrefs with a shared botocore client, whose
+connection pool is used by parallel byte range requests. botocore is installed
+with the `dvc[s3]` dependency, and imported on first use.
+"""
+
+import contextlib
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from eoap_tools.checksum import (
+    HashObject,
+    checksum_algorithm,
+    multihash,
+    new_hash,
+    supported_checksum,
+    verify,
+)
+from eoap_tools.defaults import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RETRIES,
+)
+from eoap_tools.download import DownloadError, TransferOptions
+from eoap_tools.metrics import count
+from eoap_tools.utils import preallocate
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024**2
+
+
+@dataclass(frozen=True)
+class S3Config:
+    """Settings of the shared S3 client."""
+
+    pool_size: int = DEFAULT_POOL_SIZE
+    """Maximum number of connections kept alive."""
+    retries: int = DEFAULT_RETRIES
+    """Maximum number of attempts of a request, botocore "standard" retry mode."""
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    endpoint_url: str | None = None
+    """S3 compatible endpoint, botocore default (`AWS_ENDPOINT_URL`) if None."""
+    access_key_id: str | None = None
+    """Credentials, botocore default chain (`AWS_ACCESS_KEY_ID`...) if None."""
+    secret_access_key: str | None = None
+    session_token: str | None = None
+    """Session token of temporary credentials."""
+
+
+_config = S3Config()
+_client: Any = None
+_client_lock = threading.Lock()
+
+
+def configure_s3(**kwargs: Any) -> None:
+    """Replace the shared client settings, see `S3Config` attributes."""
+    global _config, _client  # noqa: PLW0603
+    with _client_lock:
+        _config = S3Config(**kwargs)
+        _client = None
+
+
+def get_s3_client() -> Any:  # noqa: ANN401
+    """Return the shared S3 client, created on first use.
+
+    Requests are unsigned if no credentials are configured, for public buckets.
+    """
+    global _client  # noqa: PLW0603
+    with _client_lock:
+        if _client is None:
+            _client = _create_client(_config)
+        return _client
+
+
+def _create_client(config: S3Config) -> Any:  # noqa: ANN401
+    import botocore.config  # noqa: PLC0415
+    import botocore.session  # noqa: PLC0415
+    from botocore import UNSIGNED  # noqa: PLC0415
+
+    session = botocore.session.get_session()
+    client_config = botocore.config.Config(
+        max_pool_connections=config.pool_size,
+        retries={"max_attempts": config.retries, "mode": "standard"},
+        connect_timeout=config.connect_timeout,
+        read_timeout=config.read_timeout,
+    )
+    if not config.access_key_id and session.get_credentials() is None:
+        logger.debug("no S3 credentials, requests are unsigned")
+        client_config = client_config.merge(
+            botocore.config.Config(signature_version=UNSIGNED)
+        )
+    return session.create_client(
+        "s3",
+        endpoint_url=config.endpoint_url,
+        aws_access_key_id=config.access_key_id,
+        aws_secret_access_key=config.secret_access_key,
+        aws_session_token=config.session_token,
+        config=client_config,
+    )
+
+
+def s3_errors() -> tuple[type[Exception], ...]:
+    """Return the exception types of failed S3 requests."""
+    from botocore.exceptions import BotoCoreError, ClientError  # noqa: PLC0415
+
+    return BotoCoreError, ClientError
+
+
+def split_s3_href(href: str) -> tuple[str, str]:
+    """Return bucket and key of an `s3://` href.
+
+    >>> split_s3_href("s3://sentinel-cogs/tiles/31/T/CJ/B02.tif")
+    ('sentinel-cogs', 'tiles/31/T/CJ/B02.tif')
+    """
+    bucket, _, key = href.removeprefix("s3://").partition("/")
+    return bucket, key
+
+
+def head_s3(href: str) -> dict[str, Any]:
+    """Return the metadata of the S3 object at `href` (`ContentLength`, `ETag`...)."""
+    bucket, key = split_s3_href(href)
+    response: dict[str, Any] = get_s3_client().head_object(Bucket=bucket, Key=key)
+    return response
+
+
+def download_s3(
+    href: str,
+    dest_path: Path,
+    options: TransferOptions,
+    checksum: str | None = None,
+    size: int | None = None,
+) -> str | None:
+    """Download the S3 object at `href` to `dest_path`.
+
+    Objects larger than one segment are fetched with `options.segments` parallel
+    byte range requests of the object version seen first (`If-Match`), written
+    at their offset in a `.part` file renamed to `dest_path` once complete.
+    Partial downloads are not resumed.
+
+    With `options.verify` and an expected multihash `checksum`, the computed
+    checksum is returned. A file not matching `checksum` or `size` raises
+    `ChecksumError` and is removed. An invalid or unsupported `checksum` is not
+    verified, with a warning.
+    """
+    if not options.verify:
+        checksum = size = None
+    checksum = supported_checksum(checksum)
+    bucket, key = split_s3_href(href)
+    head = head_s3(href)
+    total = int(head["ContentLength"])
+    segment_size = options.segment_size
+    ranges = [
+        (start, min(start + segment_size, total) - 1)
+        for start in range(0, total, segment_size)
+    ]
+    part_path = dest_path.with_name(f"{dest_path.name}.part")
+    hasher = (
+        _SegmentHasher(new_hash(checksum_algorithm(checksum)), segment_size)
+        if checksum
+        else None
+    )
+    try:
+        # Also read, segments are hashed back while the download goes on.
+        with part_path.open("w+b") as f:
+            preallocate(f.fileno(), total)
+            fetch = functools.partial(
+                _fetch_range, f.fileno(), bucket, key, head["ETag"], hasher
+            )
+            if options.segments > 1 and len(ranges) > 1:
+                logger.debug("segmented download (%d bytes): %s", total, href)
+                with ThreadPoolExecutor(
+                    max_workers=options.segments, thread_name_prefix="segment"
+                ) as executor:
+                    list(executor.map(fetch, ranges))
+            else:
+                for byte_range in ranges:
+                    fetch(byte_range)
+        computed = multihash(hasher.hash_obj) if hasher else None
+        verify(part_path, checksum, size, computed=computed)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    part_path.replace(dest_path)
+    return computed
+
+
+def _fetch_range(  # noqa: PLR0913
+    fd: int,
+    bucket: str,
+    key: str,
+    etag: str,
+    hasher: "_SegmentHasher | None",
+    byte_range: tuple[int, int],
+) -> None:
+    """Write a byte range of object version `etag` at its offset in `fd`."""
+    start, end = byte_range
+    response = get_s3_client().get_object(
+        Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag
+    )
+    written = 0
+    with contextlib.closing(response["Body"]) as body:
+        for chunk in body.iter_chunks(CHUNK_SIZE):
+            written += os.pwrite(fd, chunk, start + written)
+            count("bytes_downloaded", len(chunk))
+    if written != end - start + 1:
+        msg = f"incomplete range at offset {start}: {written} bytes"
+        raise DownloadError(msg)
+    if hasher:
+        hasher.add(fd, start)
+
+
+class _SegmentHasher:
+    """Hash of a file written by segments, fed with completed segments in order.
+
+    Segments are read back as soon as they and their predecessors are written,
+    while still in page cache, rather than reading the whole file at the end.
+    """
+
+    def __init__(self, hash_obj: HashObject, segment_size: int) -> None:
+        self.hash_obj = hash_obj
+        self.segment_size = segment_size
+        self._done: set[int] = set()
+        self._hashed = 0
+        self._lock = threading.Lock()
+        self._hash_lock = threading.Lock()
+
+    def add(self, fd: int, start: int) -> None:
+        """Record the segment at `start` of `fd` as written, hash what is ready."""
+        with self._lock:
+            self._done.add(start)
+        with self._hash_lock:
+            while True:
+                with self._lock:
+                    if self._hashed not in self._done:
+                        return
+                    self._done.remove(self._hashed)
+                offset = self._hashed
+                end = offset + self.segment_size
+                while offset < end and (
+                    chunk := os.pread(fd, min(CHUNK_SIZE, end - offset), offset)
+                ):
+                    self.hash_obj.update(chunk)
+                    offset += len(chunk)
+                self._hashed = end
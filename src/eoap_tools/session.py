@@ -0,0 +1,167 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools session module.
+
+HTTP client layer shared by the package: one pooled `requests.Session` with
+keep-alive, retries with exponential backoff and default timeouts, also used by
+pystac through `SessionStacIO`.
+"""
+
+import logging
+import threading
+from typing import Any, Self
+
+import requests
+from pystac.stac_io import DefaultStacIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from eoap_tools import __version__
+from eoap_tools.cache import StacCache
+from eoap_tools.defaults import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RETRIES,
+)
+from eoap_tools.metrics import count
+from eoap_tools.utils import is_url
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_FACTOR = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_session: "Session | None" = None
+_session_lock = threading.Lock()
+
+
+class CountingRetry(Retry):
+    """Retry configuration counting the retries in the run metrics."""
+
+    def increment(self, *args: Any, **kwargs: Any) -> Self:
+        """Count a retry, see `urllib3.util.retry.Retry.increment`."""
+        count("http_retries")
+        return super().increment(*args, **kwargs)
+
+
+class Session(requests.Session):
+    """Requests session with a default timeout."""
+
+    def __init__(self, timeout: tuple[float, float]) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def request(  # type: ignore[override]
+        self, method: str | bytes, url: str | bytes, **kwargs: Any
+    ) -> requests.Response:
+        """Send a request, with the session timeout unless one is given."""
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+) -> Session:
+    """Create a pooled HTTP session retrying idempotent requests.
+
+    Connection errors and 429/5xx responses are retried with exponential backoff,
+    honoring `Retry-After`. Up to `pool_size` connections per host are kept alive.
+    """
+    retry = CountingRetry(
+        total=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_max=BACKOFF_MAX,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = Session(timeout=(connect_timeout, read_timeout))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = f"eoap-tools/{__version__}"
+    return session
+
+
+def configure_session(**kwargs: Any) -> Session:
+    """Replace the shared session by a new one, see `create_session` arguments."""
+    global _session  # noqa: PLW0603
+    with _session_lock:
+        if _session:
+            _session.close()
+        _session = create_session(**kwargs)
+        return _session
+
+
+def get_session() -> Session:
+    """Return the shared session, created with default settings on first use."""
+    global _session  # noqa: PLW0603
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+class SessionStacIO(DefaultStacIO):
+    """pystac I/O reading remote STAC files with the shared session.
+
+    With a `cache`, remote files are served from the cache while fresh, and
+    revalidated with `If-None-Match` / `If-Modified-Since` requests once stale.
+    """
+
+    def __init__(
+        self, headers: dict[str, str] | None = None, cache: StacCache | None = None
+    ) -> None:
+        super().__init__(headers=headers)
+        self.cache = cache
+
+    def read_text_from_href(self, href: str) -> str:
+        """Read file as a UTF-8 string."""
+        if not is_url(href):
+            return super().read_text_from_href(href)
+
+        entry = self.cache.get(href) if self.cache else None
+        if entry and self.cache and self.cache.is_fresh(entry):
+            logger.debug("STAC cache hit: %s", href)
+            count("stac_cache_hits")
+            return str(entry["text"])
+
+        headers = dict(self.headers)
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        logger.debug("GET %s", href)
+        response = get_session().get(href, headers=headers)
+        if entry and self.cache and response.status_code == requests.codes.not_modified:
+            logger.debug("STAC cache revalidated: %s", href)
+            count("stac_cache_revalidations")
+            self.cache.refresh(entry, response.headers)
+            return str(entry["text"])
+
+        response.raise_for_status()
+        response.encoding = "utf-8"
+        if self.cache:
+            count("stac_cache_misses")
+            self.cache.put(href, response.text, response.headers)
+        return response.text
@@ -14,94 +14,1075 @@
 
 """EOAP Tools stac module."""
 
+import contextlib
 import datetime
+import email.utils
+import fnmatch
+import functools
+import json
 import logging
 import mimetypes
+import re
 import shutil
 import sys
+import threading
 import time
+import urllib.parse
 import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
 from pathlib import Path
-from typing import cast
+from typing import Any, cast
 
 import pystac
-import requests
+from pystac.extensions.file import FileExtension
+from pystac.utils import make_absolute_href
 
-from eoap_tools.utils import is_url
+from eoap_tools.cache import AssetCache
+from eoap_tools.checksum import (
+    checksum_algorithm,
+    copy_file,
+    file_checksum,
+    supported_checksum,
+    verify,
+)
+from eoap_tools.defaults import DEFAULT_JOBS
+from eoap_tools.download import (
+    TransferOptions,
+    download_file,
+    is_downloaded,
+    remote_validators,
+    remote_version,
+)
+from eoap_tools.extract import archive_format, extract_archive
+from eoap_tools.metrics import count, get_metrics, phase
+from eoap_tools.session import SessionStacIO, get_session
+from eoap_tools.utils import imap_bounded, is_s3, is_url, link_file, scan_files
+from eoap_tools.writer import CatalogWriter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ITEM_ID = "output"
+MAX_OPEN_ITEMS = 1000
+"""Items built at once when generating a catalog with an item pattern."""
+INDEX_NAME = ".eoap-index.json"
+"""Index of the assets of an incrementally generated catalog, in the catalog."""
+SYNC_INDEX_NAME = ".eoap-sync.json"
+"""Versions of the assets prepared with `sync`, in the output directory."""
 
-def prepare_assets(stac_input: str, output_path: Path) -> None:
-    """Prepare STAC input assets in `output_path`."""
+
+@dataclass(frozen=True)
+class AssetFilter:
+    """Selection of the assets to prepare, all assets by default.
+
+    An asset is selected if it matches every given criterion, and any of the
+    values of a criterion.
+    """
+
+    keys: tuple[str, ...] = ()
+    """Glob patterns of the asset keys."""
+    roles: tuple[str, ...] = ()
+    """Asset roles."""
+    media_types: tuple[str, ...] = ()
+    """Glob patterns of the asset media types, parameters excluded."""
+    max_size: int | None = None
+    """Maximum `file:size`, assets of unknown size are selected."""
+
+    def selects(self, key: str, asset: pystac.Asset) -> bool:
+        """Return True if the asset `key` is selected."""
+        if self.keys and not any(fnmatch.fnmatchcase(key, k) for k in self.keys):
+            return False
+        if self.roles and not set(self.roles).intersection(asset.roles or ()):
+            return False
+        if self.media_types:
+            # e.g. "image/tiff; application=geotiff" matches "image/tiff".
+            media_type = (asset.media_type or "").split(";")[0].strip().lower()
+            if not any(
+                fnmatch.fnmatchcase(media_type, t.lower()) for t in self.media_types
+            ):
+                return False
+        size = asset.extra_fields.get("file:size")
+        return self.max_size is None or size is None or size <= self.max_size
+
+
+class HostLimiter:
+    """Limit the number of concurrent transfers per remote host."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+
+    def semaphore(self, href: str) -> threading.BoundedSemaphore:
+        """Return the semaphore guarding the host of `href`."""
+        host = urllib.parse.urlparse(href).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[host]
+
+
+def prepare_assets(  # noqa: PLR0913
+    stac_input: str,
+    output_path: Path,
+    jobs: int = DEFAULT_JOBS,
+    host_jobs: int | None = None,
+    options: TransferOptions | None = None,
+    cache: AssetCache | None = None,
+    all_items: bool = False,
+    asset_filter: AssetFilter | None = None,
+    stac_io: pystac.StacIO | None = None,
+    search: dict[str, Any] | None = None,
+    max_items: int | None = None,
+) -> dict[str, Exception]:
+    """Prepare STAC input assets in `output_path`.
+
+    Assets are transferred by a pool of `jobs` workers, with at most `host_jobs`
+    concurrent downloads from the same host. A failing asset does not stop the
+    others, errors are returned by asset name.
+
+    With a `cache`, downloads are looked up by href and version (`file:checksum`
+    or ETag) and materialized from the cache without network transfer.
+
+    With `all_items`, every item of the input catalog, child catalogs and
+    collections included, is prepared in `output_path/<item_id>`. The catalog is
+    walked lazily (see `walk_items`) and its assets streamed to the workers.
+    Errors are then returned by `<item_id>/<asset name>`.
+
+    With a `search` query, `stac_input` is a STAC API whose `/search` results,
+    at most `max_items`, are prepared like `all_items`. Pages are streamed, the
+    next one fetched while the assets of the current one are transferred (see
+    `search_items`).
+
+    Assets not selected by `asset_filter` are skipped before any transfer.
+
+    With `options.extract`, archive assets are extracted in a `<asset name>`
+    directory while read (see `eoap_tools.extract`), without going through the
+    cache.
+
+    `s3://` assets are downloaded with byte range requests of a shared client,
+    see `eoap_tools.s3`.
+
+    With `options.sync`, only the assets missing or outdated in `output_path`
+    are transferred. An asset is up to date if it matches its `file:checksum`,
+    or the version recorded when it was transferred (remote `ETag`,
+    `Last-Modified` and size, checked with a conditional request, or local size
+    and mtime). Versions are recorded in `output_path/.eoap-sync.json`.
+
+    STAC files are read with `stac_io`, by default a `SessionStacIO` without
+    cache.
+    """
+    if options is None:
+        options = TransferOptions()
+    if asset_filter is None:
+        asset_filter = AssetFilter()
+    if stac_io is None:
+        stac_io = SessionStacIO()
+
+    sync_index = _SyncIndex(output_path) if options.sync else None
+    transfers = _AssetTransfers(
+        options, HostLimiter(host_jobs or jobs), cache, sync_index
+    )
+    errors: dict[str, Exception] = {}
+    with (
+        _saved(sync_index),
+        ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="asset") as executor,
+        ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="stac") as reader,
+    ):
+        if search is not None:
+            href = _search_href(stac_input)
+            logger.info("STAC API search: %s", href)
+            items = search_items(href, search, reader, max_items=max_items)
+            tasks = _catalog_tasks(items, output_path, options, asset_filter, errors)
+        elif all_items:
+            href = _input_catalog_href(stac_input)
+            items = walk_items(
+                href, reader, max_pending=jobs, stac_io=stac_io, errors=errors
+            )
+            tasks = _catalog_tasks(items, output_path, options, asset_filter, errors)
+        else:
+            with phase("catalog_read"):
+                item = _read_input_item(stac_input, stac_io)
+            tasks = _item_tasks(item, output_path, options, asset_filter, prefix="")
+        for (name, *_), error in imap_bounded(
+            executor, transfers.try_transfer, tasks, max_pending=4 * jobs
+        ):
+            if error:
+                logger.error("asset '%s' failed: %s", name, error)
+                errors[name] = error
+
+    transfers.log_summary()
+    if cache:
+        cache.evict()
+    return errors
+
+
+def walk_items(
+    href: str,
+    executor: Executor,
+    max_pending: int = DEFAULT_JOBS,
+    stac_io: pystac.StacIO | None = None,
+    errors: dict[str, Exception] | None = None,
+) -> Iterator[pystac.Item]:
+    """Yield the items of the STAC catalog, collection or item at `href`.
+
+    Child catalogs and item JSON are read concurrently by `executor`, at most
+    `max_pending` at once. Only the hrefs of the links left to read are kept, not
+    the catalog tree, and items are yielded as soon as they are read.
+
+    With `errors`, a link that cannot be read is skipped and its error stored by
+    href, the other links are still walked. Otherwise the error is raised.
+    """
+    if stac_io is None:
+        stac_io = SessionStacIO()
+    # Depth first, to keep the stack of links to read small.
+    hrefs = [href]
+    pending: dict[Future[dict[str, Any]], str] = {}
+    while hrefs or pending:
+        while hrefs and len(pending) < max_pending:
+            link_href = hrefs.pop()
+            pending[executor.submit(_read_json, stac_io, link_href)] = link_href
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            stac_href = pending.pop(future)
+            try:
+                stac_dict = future.result()
+            except Exception as e:
+                if errors is None:
+                    raise
+                logger.error("cannot read '%s': %s", stac_href, e)
+                errors[stac_href] = e
+                continue
+            if stac_dict.get("type") == "Feature":
+                yield pystac.Item.from_dict(stac_dict, href=stac_href)
+                continue
+            hrefs.extend(
+                make_absolute_href(link["href"], stac_href)
+                for link in reversed(stac_dict.get("links", []))
+                if link.get("rel") in (pystac.RelType.CHILD, pystac.RelType.ITEM)
+            )
+
+
+def search_items(
+    href: str,
+    query: dict[str, Any],
+    executor: Executor,
+    max_items: int | None = None,
+) -> Iterator[pystac.Item]:
+    """Yield the items found by the STAC API search endpoint `href`.
+
+    The first page is requested with GET and the `query` parameters (`collections`,
+    `bbox`, `datetime`, `limit`...), lists being comma separated. The following
+    pages are requested from the `next` link of each page, with GET or POST and
+    its `body`. Each next page is requested by `executor` while the items of the
+    current one are yielded, so that only two pages are held at once. At most
+    `max_items` items are yielded.
+    """
+    params = {
+        key: ",".join(map(str, value)) if isinstance(value, list | tuple) else value
+        for key, value in query.items()
+        if value is not None
+    }
+    pending: Future[dict[str, Any]] | None = executor.submit(
+        _read_page, {"href": href, "method": "GET"}, params
+    )
+    remaining = max_items
+    while pending:
+        page = pending.result()
+        features = page.get("features", [])[:remaining]
+        if remaining is not None:
+            remaining -= len(features)
+        next_link = next(
+            (link for link in page.get("links", []) if link.get("rel") == "next"),
+            None,
+        )
+        pending = None
+        if next_link and features and remaining != 0:
+            pending = executor.submit(_read_page, next_link, None)
+        for feature in features:
+            yield pystac.Item.from_dict(feature)
+
+
+def _search_href(stac_input: str) -> str:
+    """Return the search endpoint of a STAC API root or search URL.
+
+    >>> _search_href("https://earth-search.aws.element84.com/v1/")
+    'https://earth-search.aws.element84.com/v1/search'
+    >>> _search_href("https://example.com/api/search?collections=c")
+    'https://example.com/api/search?collections=c'
+    """
+    if urllib.parse.urlparse(stac_input).path.rstrip("/").endswith("/search"):
+        return stac_input
+    return stac_input.rstrip("/") + "/search"
+
+
+def _read_page(link: dict[str, Any], params: dict[str, Any] | None) -> dict[str, Any]:
+    """Read a page of search results from a link."""
+    with phase("catalog_read"):
+        method = link.get("method", "GET").upper()
+        logger.debug("%s %s", method, link["href"])
+        response = get_session().request(
+            method,
+            link["href"],
+            params=params,
+            json=link.get("body") if method == "POST" else None,
+            headers=link.get("headers"),
+        )
+        response.raise_for_status()
+        count("search_pages")
+        page: dict[str, Any] = response.json()
+        return page
+
+
+def _read_json(stac_io: pystac.StacIO, href: str) -> dict[str, Any]:
+    with phase("catalog_read"):
+        return stac_io.read_json(href)
+
+
+def _input_catalog_href(stac_input: str) -> str:
+    if is_url(stac_input):
+        logger.info("remote STAC input: %s", stac_input)
+        return stac_input
+
+    stac_catalog_path = Path(stac_input) / "catalog.json"
+    logger.info("local STAC catalog: %s", stac_catalog_path)
+    if not stac_catalog_path.is_file():
+        logger.error("STAC catalog not found: %s", stac_catalog_path)
+        sys.exit(-1)
+    return str(stac_catalog_path.absolute())
+
+
+def _read_input_item(stac_input: str, stac_io: pystac.StacIO) -> pystac.Item:
     if is_url(stac_input):
         logger.info("remote STAC item: %s", stac_input)
-        stac_item = cast("pystac.Item", pystac.read_file(stac_input))
-    else:
-        stac_catalog_path = Path(stac_input) / "catalog.json"
-        logger.info("local STAC catalog: %s", stac_catalog_path)
-        if not stac_catalog_path.is_file():
-            logger.error("STAC catalog not found: %s", stac_catalog_path)
-            sys.exit(-1)
-
-        stac_catalog = cast("pystac.Catalog", pystac.read_file(stac_catalog_path))
-        stac_item = next(stac_catalog.get_items())
-
-    for asset_name, asset in stac_item.assets.items():
+        return cast("pystac.Item", pystac.read_file(stac_input, stac_io=stac_io))
+
+    stac_catalog_path = Path(stac_input) / "catalog.json"
+    logger.info("local STAC catalog: %s", stac_catalog_path)
+    if not stac_catalog_path.is_file():
+        logger.error("STAC catalog not found: %s", stac_catalog_path)
+        sys.exit(-1)
+
+    stac_catalog = pystac.Catalog.from_file(stac_catalog_path, stac_io=stac_io)
+    return next(stac_catalog.get_items())
+
+
+type _AssetTask = tuple[str, pystac.Asset, str, Path]
+
+
+def _catalog_tasks(
+    items: Iterator[pystac.Item],
+    output_path: Path,
+    options: TransferOptions,
+    asset_filter: AssetFilter,
+    errors: dict[str, Exception],
+) -> Iterator[_AssetTask]:
+    item_ids: set[str] = set()
+    for item in items:
+        if item.id in item_ids:
+            # Items of different collections may share an id, not an output path.
+            logger.error("duplicate item '%s' skipped: %s", item.id, item.self_href)
+            errors[item.id] = ValueError(f"duplicate item '{item.id}'")
+            continue
+        item_ids.add(item.id)
+        logger.info("STAC item: %s", item.id)
+        item_path = output_path / item.id
+        yield from _item_tasks(
+            item, item_path, options, asset_filter, prefix=f"{item.id}/"
+        )
+
+
+def _item_tasks(
+    item: pystac.Item,
+    output_path: Path,
+    options: TransferOptions,
+    asset_filter: AssetFilter,
+    prefix: str,
+) -> Iterator[_AssetTask]:
+    for asset_name, asset in item.assets.items():
         asset_href = asset.get_absolute_href()
         if not asset_href:
             continue
+        if not asset_filter.selects(asset_name, asset):
+            logger.info("asset '%s%s' not selected", prefix, asset_name)
+            continue
 
-        if is_url(asset_href):
-            dest_path: Path = output_path / asset_name
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            logger.info("download '%s' to '%s'", asset_href, dest_path)
-            response = requests.get(asset_href, timeout=10, stream=True)
-            response.raise_for_status()
-            with dest_path.open("wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        # Remote and extracted assets are named by key, local files keep their name.
+        if is_url(asset_href) or is_s3(asset_href) or _extracts(options, asset_href):
+            dest_path = output_path / asset_name
         else:
-            asset_path = Path(asset_href)
-            dest_path = output_path / asset_path.name
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            logger.info("copy '%s' to '%s'", asset_href, dest_path)
-            shutil.copyfile(asset_path, dest_path)
+            dest_path = output_path / Path(asset_href).name
+        yield prefix + asset_name, asset, asset_href, dest_path
+
+
+def _extracts(options: TransferOptions, href: str) -> bool:
+    """Whether the archive at `href` is extracted, see `options.extract`."""
+    return bool(options.extract and archive_format(href) and not is_s3(href))
+
+
+class _AssetTransfers:
+    """Transfers of assets sharing the same options, host limits and cache."""
 
+    def __init__(
+        self,
+        options: TransferOptions,
+        host_limiter: HostLimiter,
+        cache: AssetCache | None,
+        sync_index: "_SyncIndex | None" = None,
+    ) -> None:
+        self.options = options
+        self.host_limiter = host_limiter
+        self.cache = cache
+        self.sync_index = sync_index
+        self.link_modes: Counter[str] = Counter()
+        self.sync_counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def try_transfer(self, task: _AssetTask) -> Exception | None:
+        """Transfer an asset, return the error if it failed."""
+        name, asset, href, dest_path = task
+        start = time.perf_counter()
+        try:
+            with phase("asset_transfer"):
+                fetched = self.transfer(asset, href, dest_path)
+        except Exception as e:  # noqa: BLE001
+            return e
+        duration = time.perf_counter() - start
+        if dest_path.is_dir():
+            size = sum(p.stat().st_size for p in scan_files(dest_path, recursive=True))
+        else:
+            size = dest_path.stat().st_size
+        get_metrics().add_transfer(name, duration, size)
+        if self.sync_index:
+            outcome = "fetched" if fetched else "skipped"
+            count(f"bytes_{outcome}", size)
+            with self._lock:
+                self.sync_counts[f"assets_{outcome}"] += 1
+                self.sync_counts[f"bytes_{outcome}"] += size
+        return None
+
+    def log_summary(self) -> None:
+        """Log how local assets were materialized, and what was synchronized."""
+        if self.link_modes:
+            logger.info(
+                "local assets materialized with: %s", _format_counts(self.link_modes)
+            )
+        if self.sync_index:
+            logger.info(
+                "sync: %d assets skipped (%d bytes), %d fetched (%d bytes)",
+                self.sync_counts["assets_skipped"],
+                self.sync_counts["bytes_skipped"],
+                self.sync_counts["assets_fetched"],
+                self.sync_counts["bytes_fetched"],
+            )
+
+    def transfer(self, asset: pystac.Asset, href: str, dest_path: Path) -> bool:
+        """Transfer `asset` located at `href` to `dest_path`.
+
+        Returns False if the asset was skipped as up to date, see `options.sync`.
+        """
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        remote = is_url(href) or is_s3(href)
+        if _extracts(self.options, href):
+            transfer = self._extract
+        elif remote:
+            transfer = self._download
+        else:
+            transfer = self._materialize
+        if not remote:
+            return self._sync(transfer, asset, href, dest_path)
+        with self.host_limiter.semaphore(href):
+            return self._sync(transfer, asset, href, dest_path)
 
-def generate_catalog(assets_path: Path, catalog_path: Path) -> None:
-    """Generate STAC catalog from directory of assets."""
+    def _sync(
+        self,
+        transfer: Callable[[pystac.Asset, str, Path], None],
+        asset: pystac.Asset,
+        href: str,
+        dest_path: Path,
+    ) -> bool:
+        if self.sync_index is None:
+            transfer(asset, href, dest_path)
+            return True
+        checksum = supported_checksum(asset.extra_fields.get("file:checksum"))
+        up_to_date, version = self.sync_index.check(href, dest_path, checksum)
+        if up_to_date:
+            logger.info("up to date: %s", dest_path)
+            count("assets_skipped")
+            if version is not None:
+                self.sync_index.record(href, dest_path, version)
+            return False
+        transfer(asset, href, dest_path)
+        self.sync_index.record(href, dest_path, version)
+        return True
+
+    def _download(self, asset: pystac.Asset, href: str, dest_path: Path) -> None:
+        checksum, size = self._expected_checksum_size(asset)
+        if self.options.resume and is_downloaded(href, dest_path, checksum, size):
+            logger.info("already downloaded: %s", dest_path)
+            count("assets_skipped")
+            return
+
+        version = None
+        if self.cache:
+            version = asset.extra_fields.get("file:checksum") or remote_version(href)
+        if not (self.cache and version):
+            logger.info("download '%s' to '%s'", href, dest_path)
+            download_file(href, dest_path, self.options, checksum, size)
+            return
+
+        key = self.cache.key(href, version)
+        with self.cache.lock(key):
+            method = self.cache.get(key, dest_path)
+            if method:
+                logger.info("cache hit '%s' to '%s' (%s)", href, dest_path, method)
+                count("cache_hits")
+                return
+
+            logger.info("download '%s' to cache", href)
+            count("cache_misses")
+            download_path = self.cache.download_path(key)
+            download_file(href, download_path, self.options, checksum, size)
+            self.cache.add(key, download_path)
+            method = self.cache.get(key, dest_path)
+            logger.info("cached '%s' to '%s' (%s)", href, dest_path, method)
+
+    def _extract(self, asset: pystac.Asset, href: str, dest_path: Path) -> None:
+        if self.options.resume and dest_path.is_dir():
+            logger.info("already extracted: %s", dest_path)
+            count("assets_skipped")
+            return
+        checksum, size = self._expected_checksum_size(asset)
+        logger.info("extract '%s' to '%s'", href, dest_path)
+        extract_archive(href, dest_path, checksum, size)
+
+    def _materialize(self, asset: pystac.Asset, href: str, dest_path: Path) -> None:
+        src_path = Path(href)
+        if (
+            self.options.resume
+            and dest_path.is_file()
+            and dest_path.stat().st_size == src_path.stat().st_size
+        ):
+            logger.info("already materialized: %s", dest_path)
+            count("assets_skipped")
+            return
+        dest_path.unlink(missing_ok=True)
+        checksum, size = self._expected_checksum_size(asset)
+        try:
+            if checksum and self.options.link_mode == "copy":
+                # Hash while copying rather than reading the file twice.
+                algorithm = checksum_algorithm(checksum)
+                computed = copy_file(src_path, dest_path, algorithm)
+                mode = "copy"
+            else:
+                mode = link_file(src_path, dest_path, self.options.link_mode)
+                computed = None
+            logger.info("%s '%s' to '%s'", mode, href, dest_path)
+            verify(dest_path, checksum, size, computed=computed)
+        except BaseException:
+            dest_path.unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.link_modes[mode] += 1
+        count("bytes_materialized", dest_path.stat().st_size)
+
+    def _expected_checksum_size(
+        self, asset: pystac.Asset
+    ) -> tuple[str | None, int | None]:
+        if not self.options.verify:
+            return None, None
+        fields = asset.extra_fields
+        return supported_checksum(fields.get("file:checksum")), fields.get("file:size")
+
+
+class _SyncIndex:
+    """Versions of the assets transferred to an output directory.
+
+    Entries are keyed by destination path relative to the output directory, and
+    record the asset href, its version when transferred (remote validators, or
+    local size and mtime), and the destination mtime, to detect local changes.
+    """
+
+    def __init__(self, output_path: Path) -> None:
+        self.output_path = output_path
+        self.path = output_path / SYNC_INDEX_NAME
+        self.entries: dict[str, dict[str, Any]] = {}
+        if self.path.is_file():
+            self.entries = json.loads(self.path.read_text())
+        self._lock = threading.Lock()
+
+    def check(
+        self, href: str, dest_path: Path, checksum: str | None
+    ) -> tuple[bool, dict[str, Any] | None]:
+        """Return whether `dest_path` is up to date, and the current version of `href`.
+
+        Remote assets are checked against their `checksum` if known, otherwise
+        against their recorded version with a conditional request. Assets never
+        recorded are up to date if they have the same size and are not older.
+        """
+        with self._lock:
+            entry = self.entries.get(self._key(dest_path))
+        previous = None
+        if (
+            entry
+            and entry["href"] == href
+            and dest_path.exists()
+            and dest_path.stat().st_mtime_ns == entry["dest_mtime_ns"]
+        ):
+            previous = entry["version"]
+
+        if not (is_url(href) or is_s3(href)):
+            stat = Path(href).stat()
+            source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            if previous is not None:
+                return source == previous, source
+            return _newer_copy(dest_path, stat.st_size, stat.st_mtime_ns), source
+
+        if checksum and dest_path.is_file():
+            computed = file_checksum(dest_path, checksum_algorithm(checksum))
+            return computed.lower() == checksum.lower(), None
+        version = remote_validators(href, previous)
+        if version is None or previous is not None:
+            return version is not None and version == previous, version
+        last_modified = version["last_modified"]
+        mtime_ns = (
+            int(email.utils.parsedate_to_datetime(last_modified).timestamp() * 1e9)
+            if last_modified
+            else None
+        )
+        return _newer_copy(dest_path, version["size"], mtime_ns), version
+
+    def record(
+        self, href: str, dest_path: Path, version: dict[str, Any] | None
+    ) -> None:
+        """Record the `version` of `href` transferred to `dest_path`."""
+        key = self._key(dest_path)
+        with self._lock:
+            if version is None:
+                self.entries.pop(key, None)
+            else:
+                self.entries[key] = {
+                    "href": href,
+                    "version": version,
+                    "dest_mtime_ns": dest_path.stat().st_mtime_ns,
+                }
+
+    def save(self) -> None:
+        """Write the index, replacing the previous one at once."""
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with self._lock:
+            tmp_path.write_text(json.dumps(self.entries))
+        tmp_path.replace(self.path)
+
+    def _key(self, dest_path: Path) -> str:
+        return dest_path.relative_to(self.output_path).as_posix()
+
+
+def _newer_copy(dest_path: Path, size: int | None, mtime_ns: int | None) -> bool:
+    """Whether `dest_path` is a file of `size` bytes, modified after `mtime_ns`."""
+    if size is None or mtime_ns is None or not dest_path.is_file():
+        return False
+    stat = dest_path.stat()
+    return stat.st_size == size and stat.st_mtime_ns >= mtime_ns
+
+
+@contextlib.contextmanager
+def _saved(sync_index: _SyncIndex | None) -> Iterator[None]:
+    """Save `sync_index` on exit, even if the run is interrupted."""
+    try:
+        yield
+    finally:
+        if sync_index:
+            sync_index.save()
+
+
+def generate_catalog(  # noqa: PLR0913
+    assets_path: Path,
+    catalog_path: Path,
+    jobs: int = DEFAULT_JOBS,
+    checksum: bool = True,
+    link_mode: str = "copy",
+    recursive: bool = False,
+    item_pattern: re.Pattern[str] | None = None,
+    incremental: bool = False,
+) -> None:
+    """Generate STAC catalog from directory of assets.
+
+    Assets are materialized with `link_mode` (see `eoap_tools.utils.link_file`) by
+    a pool of `jobs` workers. Their `file:size` is recorded, and their
+    `file:checksum` if `checksum` is True, computed while copying in copy mode.
+
+    Files are grouped in one item "output", or with `recursive` in one item per
+    directory. Files whose relative path matches `item_pattern` go to the item
+    named by its group "item" (or first group, or whole match) instead.
+
+    Items are written as soon as all their assets are materialized, see
+    `eoap_tools.writer.CatalogWriter`. With `item_pattern`, at most
+    `MAX_OPEN_ITEMS` items are built at once: the files of an item must be
+    found (in path order) before those of as many other items, or `ValueError`
+    is raised.
+
+    With `incremental`, an existing catalog is updated: only new or changed files
+    (by size and mtime) are materialized, removed ones are deleted, and only their
+    items are rewritten. Assets are tracked in the catalog `INDEX_NAME` file.
+    """
     if not assets_path.is_dir():
         logger.error("assets path does not exists: %s", assets_path)
         sys.exit(-1)
 
-    stac_catalog = pystac.Catalog(
+    if incremental:
+        options = {
+            "checksum": checksum,
+            "link_mode": link_mode,
+            "recursive": recursive,
+            "item_pattern": item_pattern.pattern if item_pattern else None,
+        }
+        index = _CatalogIndex(catalog_path, options)
+        assets = _scan_assets(assets_path, recursive, item_pattern)
+        index.update(assets_path, assets, jobs, checksum, link_mode)
+        return
+
+    stac_catalog = _new_catalog()
+    link_modes: Counter[str] = Counter()
+    materialize = functools.partial(
+        _materialize_asset,
+        catalog_path=catalog_path,
+        checksum=checksum,
+        link_mode=link_mode,
+    )
+    with (
+        CatalogWriter(catalog_path, stac_catalog, jobs=jobs) as writer,
+        ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="asset") as executor,
+    ):
+        # Without pattern, the files of an item are scanned consecutively.
+        max_open = MAX_OPEN_ITEMS if item_pattern else 1
+        items = _CatalogItems(writer, max_open=max_open)
+        assets = items.track(_scan_assets(assets_path, recursive, item_pattern))
+        for (item_id, asset_path), (mode, size, asset_checksum) in imap_bounded(
+            executor, materialize, assets, max_pending=4 * jobs
+        ):
+            link_modes[mode] += 1
+            items.add_asset(item_id, asset_path, size, asset_checksum)
+        items.close()
+
+    if link_modes:
+        logger.info("assets materialized with: %s", _format_counts(link_modes))
+    logger.info(
+        "STAC catalog saved to: %s (%d items)", catalog_path, len(writer.item_ids)
+    )
+
+
+class _CatalogItems:
+    """Items built from materialized assets, written once complete.
+
+    At most `max_open` items receive scanned assets: above, the least recently
+    scanned item is closed, and written once its assets are materialized. Assets
+    of closed items and duplicate asset names are rejected.
+    """
+
+    def __init__(self, writer: CatalogWriter, max_open: int) -> None:
+        self.writer = writer
+        self.max_open = max_open
+        self.items: dict[str, pystac.Item] = {}
+        self.pending: Counter[str] = Counter()
+        # Asset names of the open items, least recently scanned first.
+        self.open: OrderedDict[str, set[str]] = OrderedDict()
+        self.closed: set[str] = set()
+
+    def track(self, assets: Iterator[tuple[str, Path]]) -> Iterator[tuple[str, Path]]:
+        """Track the scanned assets, to know when items are complete."""
+        for item_id, asset_path in assets:
+            if item_id in self.closed:
+                msg = (
+                    f"files of item '{item_id}' found after those of "
+                    f"{self.max_open} other items"
+                )
+                raise ValueError(msg)
+            names = self.open.setdefault(item_id, set())
+            self.open.move_to_end(item_id)
+            if asset_path.name in names:
+                msg = f"duplicate asset '{asset_path.name}' in item '{item_id}'"
+                raise ValueError(msg)
+            names.add(asset_path.name)
+            self.pending[item_id] += 1
+            while len(self.open) > self.max_open:
+                self._close(next(iter(self.open)))
+            yield item_id, asset_path
+        while self.open:
+            self._close(next(iter(self.open)))
+
+    def add_asset(
+        self, item_id: str, asset_path: Path, size: int, checksum: str | None
+    ) -> None:
+        """Add a materialized asset to its item."""
+        if item_id not in self.items:
+            self.items[item_id] = _new_item(item_id)
+        _add_asset(self.items[item_id], asset_path.name, size, checksum)
+        self.pending[item_id] -= 1
+        self._write_if_complete(item_id)
+
+    def close(self) -> None:
+        """Write remaining items, or an empty default item if there was none."""
+        for item_id in sorted(self.items):
+            self._write(item_id)
+        if not self.writer.item_ids:
+            self.items[DEFAULT_ITEM_ID] = _new_item(DEFAULT_ITEM_ID)
+            self._write(DEFAULT_ITEM_ID)
+
+    def _close(self, item_id: str) -> None:
+        del self.open[item_id]
+        self.closed.add(item_id)
+        self._write_if_complete(item_id)
+
+    def _write_if_complete(self, item_id: str) -> None:
+        if (
+            item_id in self.closed
+            and not self.pending[item_id]
+            and item_id in self.items
+        ):
+            self._write(item_id)
+
+    def _write(self, item_id: str) -> None:
+        item = self.items.pop(item_id)
+        item.assets = dict(sorted(item.assets.items()))
+        self.writer.write_item(item)
+        del self.pending[item_id]
+
+
+def _new_catalog() -> pystac.Catalog:
+    return pystac.Catalog(
         id=f"eoap-{str(uuid.uuid4())[:8]}-{int(time.time())}",
         description="Processing output STAC catalog.",
     )
-    stac_item = pystac.Item(
-        id="output",
+
+
+def _new_item(item_id: str) -> pystac.Item:
+    return pystac.Item(
+        id=item_id,
         geometry=None,
         bbox=None,
         datetime=datetime.datetime.now(tz=datetime.UTC),
         properties={},
     )
 
-    for asset_path in assets_path.iterdir():
-        if asset_path.is_file():
-            mime_type, _ = mimetypes.guess_type(asset_path)
-            media_type = mime_type if mime_type else "application/octet-stream"
-            stac_item.add_asset(
-                key=asset_path.name,
-                asset=pystac.Asset(href=asset_path.name, media_type=media_type),
+
+def _add_asset(item: pystac.Item, name: str, size: int, checksum: str | None) -> None:
+    mime_type, _ = mimetypes.guess_type(name)
+    media_type = mime_type if mime_type else "application/octet-stream"
+    asset = pystac.Asset(href=name, media_type=media_type)
+    item.add_asset(key=name, asset=asset)
+    file_ext = FileExtension.ext(asset, add_if_missing=True)
+    file_ext.size = size
+    if checksum:
+        file_ext.checksum = checksum
+
+
+class _CatalogIndex:
+    """Index of the assets of a catalog, by path relative to the assets directory.
+
+    Entries record the item, size, mtime and checksum of each asset. A catalog
+    without index, or with an index generated with other `options`, is rebuilt:
+    its previous items are removed, and all assets materialized again.
+    """
+
+    def __init__(self, catalog_path: Path, options: dict[str, Any]) -> None:
+        self.catalog_path = catalog_path
+        self.path = catalog_path / INDEX_NAME
+        self.options = options
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.stale_items: set[str] = set()
+        if self.path.is_file():
+            data = json.loads(self.path.read_text())
+            if data.get("options") == options:
+                self.entries = data["assets"]
+            else:
+                logger.info("catalog generated with other options, rebuild it")
+                self.stale_items = {entry["item"] for entry in data["assets"].values()}
+        elif (catalog_path / "catalog.json").is_file():
+            logger.info("catalog generated without index, rebuild it")
+            self.stale_items = self._catalog_items()
+
+    def update(
+        self,
+        assets_path: Path,
+        assets: Iterator[tuple[str, Path]],
+        jobs: int,
+        checksum: bool,
+        link_mode: str,
+    ) -> None:
+        """Update the catalog with the scanned `assets`, then save the index."""
+        for item_id in sorted(self.stale_items):
+            logger.info("remove previous item: %s", item_id)
+            shutil.rmtree(self.catalog_path / item_id, ignore_errors=True)
+        previous = self.entries
+        self.entries = {}
+        changed: list[tuple[str, Path]] = []
+        names: set[tuple[str, str]] = set()
+        for item_id, asset_path in assets:
+            if (item_id, asset_path.name) in names:
+                msg = f"duplicate asset '{asset_path.name}' in item '{item_id}'"
+                raise ValueError(msg)
+            names.add((item_id, asset_path.name))
+            key = asset_path.relative_to(assets_path).as_posix()
+            stat = asset_path.stat()
+            entry = previous.get(key)
+            if (
+                entry
+                and entry["item"] == item_id
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and (self.catalog_path / item_id / asset_path.name).is_file()
+            ):
+                self.entries[key] = entry
+            else:
+                # Not overwritten in place, it may be a hardlink to the source.
+                (self.catalog_path / item_id / asset_path.name).unlink(missing_ok=True)
+                changed.append((item_id, asset_path))
+                self.entries[key] = {"item": item_id, "mtime_ns": stat.st_mtime_ns}
+
+        affected = {item_id for item_id, _ in changed}
+        for key, entry in previous.items():
+            if self.entries.get(key, {}).get("item") != entry["item"]:
+                logger.info("remove '%s' from item: %s", key, entry["item"])
+                dest_path = self.catalog_path / entry["item"] / Path(key).name
+                dest_path.unlink(missing_ok=True)
+                affected.add(entry["item"])
+
+        materialize = functools.partial(
+            _materialize_asset,
+            catalog_path=self.catalog_path,
+            checksum=checksum,
+            link_mode=link_mode,
+        )
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="asset") as ex:
+            for (_, asset_path), (_, size, asset_checksum) in imap_bounded(
+                ex, materialize, iter(changed), max_pending=4 * jobs
+            ):
+                key = asset_path.relative_to(assets_path).as_posix()
+                self.entries[key].update(size=size, checksum=asset_checksum)
+
+        self._write_items(affected, jobs)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"options": self.options, "assets": self.entries})
+        )
+        tmp_path.replace(self.path)
+        logger.info(
+            "STAC catalog updated: %s (%d assets materialized, %d items rewritten)",
+            self.catalog_path,
+            len(changed),
+            len(affected),
+        )
+
+    def _write_items(self, affected: set[str], jobs: int) -> None:
+        """Rewrite the `affected` items, delete the empty ones, and the catalog."""
+        items: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        for key, entry in self.entries.items():
+            items.setdefault(entry["item"], []).append((Path(key).name, entry))
+        if not items:
+            items[DEFAULT_ITEM_ID] = []
+            affected.add(DEFAULT_ITEM_ID)
+
+        with CatalogWriter(self.catalog_path, self._catalog(), jobs=jobs) as writer:
+            for item_id in sorted(items.keys() | affected):
+                if item_id not in items:
+                    logger.info("remove empty item: %s", item_id)
+                    (self.catalog_path / item_id / f"{item_id}.json").unlink(
+                        missing_ok=True
+                    )
+                    with contextlib.suppress(OSError):
+                        (self.catalog_path / item_id).rmdir()
+                elif item_id in affected:
+                    item = _new_item(item_id)
+                    for name, entry in sorted(items[item_id], key=lambda a: a[0]):
+                        _add_asset(item, name, entry["size"], entry["checksum"])
+                    writer.write_item(item)
+                else:
+                    writer.add_written_item(item_id)
+
+    def _catalog_items(self) -> set[str]:
+        """Return the ids of the items linked by the existing catalog."""
+        catalog_dict = json.loads((self.catalog_path / "catalog.json").read_text())
+        item_ids = set()
+        for link in catalog_dict.get("links", []):
+            if link.get("rel") != pystac.RelType.ITEM:
+                continue
+            # Items are written in a directory named by their id, see the writer.
+            item_dir = Path(urllib.parse.urlparse(link["href"]).path).parent
+            if len(item_dir.parts) == 1 and item_dir.name not in ("", ".", ".."):
+                item_ids.add(item_dir.name)
+        return item_ids
+
+    def _catalog(self) -> pystac.Catalog:
+        """Return the existing catalog, without its links, or a new one."""
+        catalog_file = self.catalog_path / "catalog.json"
+        if catalog_file.is_file():
+            catalog_dict = json.loads(catalog_file.read_text())
+            return pystac.Catalog(
+                id=catalog_dict["id"], description=catalog_dict["description"]
             )
-            dest_path: Path = catalog_path / stac_item.id / asset_path.name
-            logger.info("copy '%s' to: %s", asset_path, dest_path)
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copyfile(asset_path, dest_path)
-
-    stac_catalog.add_item(stac_item)
-    stac_catalog.normalize_and_save(
-        str(catalog_path), catalog_type=pystac.CatalogType.SELF_CONTAINED
-    )
-    logger.info("STAC catalog saved to: %s", catalog_path)
+        return _new_catalog()
+
+
+def _scan_assets(
+    assets_path: Path, recursive: bool, item_pattern: re.Pattern[str] | None
+) -> Iterator[tuple[str, Path]]:
+    # Directory ids are ambiguous ("a-b" and "a/b", "output" and the root), each
+    # id must come from one directory. Files of a directory have unique names.
+    item_dirs: dict[str, Path] = {}
+    for asset_path in scan_files(assets_path, recursive=recursive):
+        relative_path = asset_path.relative_to(assets_path)
+        match = item_pattern.search(relative_path.as_posix()) if item_pattern else None
+        if match:
+            if "item" in match.re.groupindex:
+                item_id = match["item"]
+            else:
+                item_id = match[1] if match.re.groups else match[0]
+            item_id = item_id.replace("/", "-")
+        elif relative_path.parent.parts:
+            item_id = "-".join(relative_path.parent.parts)
+        else:
+            item_id = DEFAULT_ITEM_ID
+
+        if not match:
+            directory = item_dirs.setdefault(item_id, relative_path.parent)
+            if directory != relative_path.parent:
+                msg = (
+                    f"directories '{directory}' and '{relative_path.parent}' "
+                    f"both map to item '{item_id}'"
+                )
+                raise ValueError(msg)
+        yield item_id, asset_path
+
+
+def _materialize_asset(
+    asset: tuple[str, Path], catalog_path: Path, checksum: bool, link_mode: str
+) -> tuple[str, int, str | None]:
+    item_id, asset_path = asset
+    dest_path = catalog_path / item_id / asset_path.name
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    asset_checksum: str | None = None
+    with phase("asset_materialize"):
+        if checksum and link_mode == "copy":
+            # Hash while copying rather than reading the file twice.
+            mode, asset_checksum = "copy", copy_file(asset_path, dest_path)
+        else:
+            mode = link_file(asset_path, dest_path, link_mode)
+            asset_checksum = file_checksum(asset_path) if checksum else None
+    logger.info("%s '%s' to: %s", mode, asset_path, dest_path)
+    size = asset_path.stat().st_size
+    count("bytes_materialized", size)
+    return mode, size, asset_checksum
+
+
+def _format_counts(counts: Counter[str]) -> str:
+    return ", ".join(f"{key}={count}" for key, count in sorted(counts.items()))
@@ -14,7 +14,31 @@
 
 """EOAP Tools utils module."""
 
+import contextlib
+import logging
+import os
+import re
+import shutil
 import urllib.parse
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_SIZE_REGEX = re.compile(
+    r"(?P<value>\d+(\.\d+)?)\s*(?P<unit>[KMGTP]?)(i?B)?", re.IGNORECASE
+)
+_SIZE_UNITS = "KMGTP"
+_FICLONE = 0x40049409
+
+LINK_MODES = ("auto", "copy", "hardlink", "reflink", "symlink")
 
 
 def is_url(href: str) -> bool:
@@ -23,8 +47,163 @@ def is_url(href: str) -> bool:
     return bool(parsed_url.scheme.startswith("http") and parsed_url.netloc)
 
 
+def is_s3(href: str) -> bool:
+    """Returns True if `href` is an `s3://` URL, False otherwise."""
+    return href.startswith("s3://")
+
+
 def url_basic_auth(url: str, user: str, password: str) -> str:
     """Add bare basic auth user/password authentication in URL."""
     parsed_url = list(urllib.parse.urlparse(url))
     parsed_url[1] = f"{user}:{password}@{parsed_url[1]}"
     return urllib.parse.urlunparse(parsed_url)
+
+
+def parse_size(size: str) -> int:
+    """Parse a human-readable size in bytes, units are powers of 1024.
+
+    >>> parse_size("512")
+    512
+    >>> parse_size("64M")
+    67108864
+    >>> parse_size("1.5 GiB")
+    1610612736
+    """
+    match = _SIZE_REGEX.fullmatch(size.strip())
+    if not match:
+        msg = f"invalid size: {size!r}"
+        raise ValueError(msg)
+    unit = match["unit"].upper()
+    exponent = _SIZE_UNITS.index(unit) + 1 if unit else 0
+    return int(float(match["value"]) * 1024**exponent)
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `path`, shared between processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        if fcntl is None:  # pragma: no cover
+            yield
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def reflink(src: Path, dst: Path) -> None:
+    """Clone `src` to `dst` sharing data blocks (copy-on-write filesystems)."""
+    if fcntl is None:  # pragma: no cover
+        msg = "reflink not supported"
+        raise OSError(msg)
+    with src.open("rb") as fsrc, dst.open("wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            dst.unlink(missing_ok=True)
+            raise
+
+
+def kernel_copy(src: Path, dst: Path) -> None:
+    """Copy `src` to `dst` in kernel space, with `copy_file_range` or `sendfile`."""
+    if not hasattr(os, "copy_file_range"):  # pragma: no cover
+        shutil.copyfile(src, dst)
+        return
+    with src.open("rb") as fsrc, dst.open("wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if not copied:
+                    break
+                remaining -= copied
+        except OSError:
+            # Not supported between these filesystems, shutil uses sendfile.
+            remaining = -1
+    if remaining:
+        shutil.copyfile(src, dst)
+
+
+def preallocate(fd: int, size: int) -> None:
+    """Resize the file `fd` to `size` bytes, allocating its blocks if supported."""
+    os.truncate(fd, size)
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError:
+            logger.debug("posix_fallocate not supported, file left sparse")
+
+
+def link_file(src: Path, dst: Path, mode: str = "auto") -> str:
+    """Materialize `src` at `dst` with link `mode`, return the mode used.
+
+    Modes are `copy`, `hardlink`, `reflink`, `symlink`, or `auto` which tries
+    reflink, then hardlink, and falls back to a kernel-side copy.
+    """
+    link_functions: dict[str, Callable[[Path, Path], None]] = {
+        "reflink": reflink,
+        "hardlink": lambda src, dst: dst.hardlink_to(src),
+        "symlink": lambda src, dst: dst.symlink_to(src.resolve()),
+        "copy": kernel_copy,
+    }
+    if mode != "auto":
+        if mode not in link_functions:
+            msg = f"invalid link mode: {mode}"
+            raise ValueError(msg)
+        link_functions[mode](src, dst)
+        return mode
+
+    for auto_mode in ("reflink", "hardlink"):
+        try:
+            link_functions[auto_mode](src, dst)
+        except OSError:
+            continue
+        return auto_mode
+    kernel_copy(src, dst)
+    return "copy"
+
+
+def scan_files(path: Path, recursive: bool = False) -> Iterator[Path]:
+    """Yield files under directory `path`, sorted by name in each directory.
+
+    Directories are scanned lazily, one at a time, and symlinks are not followed.
+    """
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            sorted_entries = sorted(entries, key=lambda entry: entry.name)
+        subdirectories = []
+        for entry in sorted_entries:
+            if entry.is_file():
+                yield Path(entry.path)
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirectories.append(Path(entry.path))
+        stack.extend(reversed(subdirectories))
+
+
+def imap_bounded[T, R](
+    executor: Executor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_pending: int,
+) -> Iterator[tuple[T, R]]:
+    """Map `fn` over `items` with `executor`, yield `(item, result)` as completed.
+
+    Items are consumed lazily, with at most `max_pending` submitted tasks at once,
+    which bounds memory usage for large iterables.
+    """
+    pending: dict[Future[R], T] = {}
+    for item in items:
+        if len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+        pending[executor.submit(fn, item)] = item
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future.result()
@@ -0,0 +1,126 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""EOAP Tools catalog writer module."""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import pystac
+from pystac.stac_io import StacIO
+
+from eoap_tools.defaults import DEFAULT_JOBS
+from eoap_tools.metrics import phase
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogWriter:
+    """Write a self-contained STAC catalog, one item at a time.
+
+    Items are serialized and written by a pool of `jobs` workers as soon as they
+    are added, with relative links computed directly, so the catalog is never held
+    in memory. The root `catalog.json` is written last, when the writer is closed,
+    with its item links sorted by id to not depend on the order items are added.
+    The files are identical to `pystac.Catalog.normalize_and_save` output for a
+    self-contained catalog of items added in id order.
+    """
+
+    def __init__(
+        self, path: Path, catalog: pystac.Catalog, jobs: int = DEFAULT_JOBS
+    ) -> None:
+        self.path = path
+        self.catalog = catalog
+        self.item_ids: list[str] = []
+        self._item_ids_set: set[str] = set()
+        self._stac_io = StacIO.default()
+        self._max_pending = 4 * jobs
+        self._executor = ThreadPoolExecutor(
+            max_workers=jobs, thread_name_prefix="writer"
+        )
+        self._pending: set[Future[None]] = set()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(cancel_futures=True)
+
+    def write_item(self, item: pystac.Item) -> None:
+        """Write `item` in the catalog, its assets hrefs must be relative."""
+        if item.id in self._item_ids_set:
+            msg = f"duplicate item: {item.id}"
+            raise ValueError(msg)
+        if len(self._pending) >= self._max_pending:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+
+        item_dict = item.to_dict(include_self_link=False, transform_hrefs=False)
+        item_dict["links"] = [
+            _link("root", "../catalog.json", pystac.MediaType.JSON),
+            _link("parent", "../catalog.json", pystac.MediaType.JSON),
+        ]
+        item_path = self.path / item.id / f"{item.id}.json"
+        self._pending.add(self._executor.submit(self._write, item_path, item_dict))
+        self.item_ids.append(item.id)
+        self._item_ids_set.add(item.id)
+
+    def add_written_item(self, item_id: str) -> None:
+        """Link an item already written in the catalog directory, by a previous run."""
+        if item_id in self._item_ids_set:
+            msg = f"duplicate item: {item_id}"
+            raise ValueError(msg)
+        self.item_ids.append(item_id)
+        self._item_ids_set.add(item_id)
+
+    def close(self) -> None:
+        """Wait for items to be written, then write the root catalog."""
+        self._executor.shutdown()
+        for future in self._pending:
+            future.result()
+        self._pending.clear()
+
+        catalog_dict = self.catalog.to_dict(
+            include_self_link=False, transform_hrefs=False
+        )
+        catalog_dict["links"] = [
+            _link("root", "./catalog.json", pystac.MediaType.JSON),
+            *(
+                _link("item", f"./{item_id}/{item_id}.json", pystac.MediaType.GEOJSON)
+                for item_id in sorted(self.item_ids)
+            ),
+        ]
+        self._write(self.path / "catalog.json", catalog_dict)
+        logger.debug("catalog written: %s", self.path)
+
+    def _write(self, path: Path, stac_dict: dict[str, Any]) -> None:
+        with phase("catalog_write"):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(self._stac_io.json_dumps(stac_dict), encoding="utf-8")
+
+
+def _link(rel: str, href: str, media_type: str) -> dict[str, str]:
+    return {"rel": rel, "href": href, "type": media_type}
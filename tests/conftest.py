@@ -0,0 +1,287 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests fixtures."""
+
+import contextlib
+import functools
+import json
+import re
+import threading
+import urllib.parse
+from collections.abc import Callable, Iterator
+from http.server import (
+    BaseHTTPRequestHandler,
+    SimpleHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from pathlib import Path
+from typing import Any, ClassVar
+
+import git
+import pytest
+from dvc.repo import Repo as DvcRepo
+
+
+class QuietHTTPRequestHandler(SimpleHTTPRequestHandler):
+    """HTTP request handler serving a directory without logging requests.
+
+    Single byte range requests are supported if `accept_ranges` is True, and
+    requests with the current `If-None-Match` ETag answered "304 Not Modified".
+    Paths in `failures` are answered with as many "503 Service Unavailable" errors.
+    """
+
+    accept_ranges = True
+    failures: ClassVar[dict[str, int]] = {}
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Disable request logging."""
+
+    def do_GET(self) -> None:
+        """Serve a GET request, with optional byte range."""
+        if self.failures.get(self.path):
+            self.failures[self.path] -= 1
+            self.send_error(503)
+            return
+
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            super().do_GET()
+            return
+
+        data = path.read_bytes()
+        etag = _etag(path)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if self.headers.get("If-Range", etag) != etag:
+            match = None
+        if not (self.accept_ranges and match):
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        start = int(match[1])
+        end = min(int(match[2]) if match[2] else len(data) - 1, len(data) - 1)
+        if start >= len(data):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(data)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        self.wfile.write(data[start : end + 1])
+
+    def do_HEAD(self) -> None:
+        """Serve a HEAD request, with the ETag and conditions of a GET request."""
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            super().do_HEAD()
+            return
+        etag = _etag(path)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.send_header("Last-Modified", self.date_time_string(path.stat().st_mtime))
+        self.end_headers()
+
+
+def _etag(path: Path) -> str:
+    stat = path.stat()
+    return f'"{stat.st_mtime_ns}-{stat.st_size}"'
+
+
+class StacApiRequestHandler(BaseHTTPRequestHandler):
+    """Mock STAC API `/search` endpoint, over the item dicts of `items`.
+
+    Items are filtered by the `collections` parameter, and paginated by `limit`
+    with `next` links carrying the offset of the next page in a `token`.
+    """
+
+    items: ClassVar[list[dict[str, Any]]] = []
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Disable request logging."""
+
+    def do_GET(self) -> None:
+        """Serve a page of search results."""
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/search":
+            self.send_error(404)
+            return
+        query = dict(urllib.parse.parse_qsl(url.query))
+        collections = query.get("collections")
+        items = [
+            item
+            for item in self.items
+            if not collections or item.get("collection") in collections.split(",")
+        ]
+        start = int(query.get("token", 0))
+        end = start + int(query.get("limit", 10))
+        links = []
+        if end < len(items):
+            next_query = urllib.parse.urlencode({**query, "token": end})
+            links.append(
+                {
+                    "rel": "next",
+                    "href": f"http://{self.headers['Host']}/search?{next_query}",
+                    "type": "application/geo+json",
+                    "method": "GET",
+                }
+            )
+        body = json.dumps(
+            {"type": "FeatureCollection", "features": items[start:end], "links": links}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def http_dir(tmp_path: Path) -> Path:
+    """Directory served by the `http_server` fixture."""
+    path = tmp_path / "http"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def http_no_ranges(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Disable byte range requests support of the `http_server` fixture."""
+    monkeypatch.setattr(QuietHTTPRequestHandler, "accept_ranges", False)
+
+
+@pytest.fixture
+def http_failures(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    """Number of errors returned by the `http_server` fixture, by URL path."""
+    failures: dict[str, int] = {}
+    monkeypatch.setattr(QuietHTTPRequestHandler, "failures", failures)
+    return failures
+
+
+@pytest.fixture
+def http_server(http_dir: Path) -> Iterator[str]:
+    """Serve `http_dir` on localhost, yield the server base URL."""
+    handler = functools.partial(QuietHTTPRequestHandler, directory=str(http_dir))
+    with _serve(handler) as url:
+        yield url
+
+
+@pytest.fixture
+def stac_api_items(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    """Item dicts searched through the `stac_api` fixture."""
+    items: list[dict[str, Any]] = []
+    monkeypatch.setattr(StacApiRequestHandler, "items", items)
+    return items
+
+
+@pytest.fixture
+def stac_api(stac_api_items: list[dict[str, Any]]) -> Iterator[str]:
+    """Serve a mock STAC API on localhost, yield its root URL."""
+    with _serve(StacApiRequestHandler) as url:
+        yield url
+
+
+@contextlib.contextmanager
+def _serve(handler: Callable[..., BaseHTTPRequestHandler]) -> Iterator[str]:
+    """Serve requests with `handler` on localhost, yield the server base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def git_remote(tmp_path: Path) -> git.Repo:
+    """Dataset repository with two commits, tagged "v1" and "v2"."""
+    repo = git.Repo.init(tmp_path / "remote")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+        # Allow partial clones through the file:// protocol.
+        config.set_value("uploadpack", "allowFilter", "true")
+    files = {
+        ".dvc/config": "[core]\n",
+        "dvc.lock": "",
+        "data/train.dvc": "train",
+        "data/val.dvc": "val",
+        "data/train/.gitignore": "/*.tif",
+        "docs/README.md": "v1",
+    }
+    for name, content in files.items():
+        file_path = Path(repo.working_dir) / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+    repo.git.add(A=True)
+    repo.index.commit("v1")
+    repo.create_tag("v1")
+    (Path(repo.working_dir) / "docs/README.md").write_text("v2")
+    repo.git.add(A=True)
+    repo.index.commit("v2")
+    repo.create_tag("v2")
+    return repo
+
+
+@pytest.fixture
+def dvc_remote(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> git.Repo:
+    """DVC dataset repository, with data pushed to a local remote.
+
+    "data/train" has 3 files of 1000 bytes, "data/val" 1 file of 500 bytes.
+    """
+    repo = git.Repo.init(tmp_path / "dvc-remote")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    repo_path = Path(repo.working_dir)
+    dvc_repo = DvcRepo.init(str(repo_path))
+    with dvc_repo.config.edit() as conf:
+        conf["remote"]["storage"] = {"url": str(tmp_path / "dvc-storage")}
+        conf["core"]["remote"] = "storage"
+    for name, size in (("train/0", 1000), ("train/1", 1000), ("train/2", 1000)):
+        file_path = repo_path / "data" / f"{name}.bin"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(name.encode().ljust(size, b"-"))
+    (repo_path / "data" / "val").mkdir()
+    (repo_path / "data" / "val" / "0.bin").write_bytes(b"val".ljust(500, b"-"))
+    # DVC resolves paths from the working directory.
+    monkeypatch.chdir(repo_path)
+    dvc_repo.add(["data/train", "data/val"])
+    dvc_repo.push()
+    monkeypatch.undo()
+    repo.git.add(A=True)
+    repo.index.commit("data")
+    return repo
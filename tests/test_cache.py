@@ -0,0 +1,118 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache module test."""
+
+import os
+import stat
+import time
+from pathlib import Path
+
+import pytest
+
+from eoap_tools.cache import AssetCache, StacCache
+
+
+def test_cache_key() -> None:
+    """Keys depend on href and version."""
+    key = AssetCache.key("https://example.com/a.tif", '"etag"')
+    assert key == AssetCache.key("https://example.com/a.tif", '"etag"')
+    assert key != AssetCache.key("https://example.com/a.tif", '"other"')
+    assert key != AssetCache.key("https://example.com/b.tif", '"etag"')
+
+
+def test_cache_add_get(tmp_path: Path) -> None:
+    """Cached entries are materialized, missing ones are not."""
+    cache = AssetCache(tmp_path / "cache")
+    key = cache.key("https://example.com/a.tif", '"etag"')
+    download_path = cache.download_path(key)
+    download_path.write_bytes(b"data")
+
+    assert cache.get(key, tmp_path / "miss") is None
+    cache.add(key, download_path)
+    method = cache.get(key, tmp_path / "hit")
+
+    assert method in ("reflink", "hardlink", "copy")
+    assert (tmp_path / "hit").read_bytes() == b"data"
+    assert not cache.object_path(key).stat().st_mode & stat.S_IWUSR
+
+
+def test_cache_get_not_owned(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entries that cannot be touched, owned by another user, are still used."""
+    cache = AssetCache(tmp_path / "cache")
+    key = cache.key("https://example.com/a.tif", '"etag"')
+    download_path = cache.download_path(key)
+    download_path.write_bytes(b"data")
+    cache.add(key, download_path)
+
+    def utime(*_: object) -> None:
+        raise PermissionError
+
+    monkeypatch.setattr(os, "utime", utime)
+
+    assert cache.get(key, tmp_path / "hit") is not None
+    assert (tmp_path / "hit").read_bytes() == b"data"
+
+
+def test_cache_evict(tmp_path: Path) -> None:
+    """Least recently used entries are evicted above the maximum size."""
+    cache = AssetCache(tmp_path / "cache", max_size=25)
+    keys = [cache.key(f"https://example.com/{i}", "v") for i in range(3)]
+    for i, key in enumerate(keys):
+        download_path = cache.download_path(key)
+        download_path.write_bytes(bytes(10))
+        cache.add(key, download_path)
+        os.utime(cache.object_path(key), (i, i))
+    # Access the oldest entry, so the second one becomes least recently used.
+    cache.get(keys[0], tmp_path / "hit")
+
+    assert cache.evict() == 10
+    assert cache.object_path(keys[0]).exists()
+    assert not cache.object_path(keys[1]).exists()
+    assert cache.object_path(keys[2]).exists()
+
+
+def test_stac_cache_freshness(tmp_path: Path) -> None:
+    """Documents are fresh for their max-age capped at the TTL, or not stored."""
+    cache = StacCache(tmp_path / "cache", ttl=60)
+    href = "https://example.com/item.json"
+
+    cache.put(href, "{}", {"ETag": '"v1"', "Cache-Control": "max-age=3600"})
+    entry = cache.get(href)
+    assert entry is not None
+    assert entry["text"] == "{}"
+    assert cache.is_fresh(entry)
+    assert entry["fresh_until"] <= time.time() + 60
+
+    cache.refresh(entry, {"Cache-Control": "no-cache"})
+    entry = cache.get(href)
+    assert entry is not None
+    assert entry["etag"] == '"v1"'
+    assert not cache.is_fresh(entry)
+
+    cache.put(href, "{}", {"ETag": '"v2"', "Cache-Control": "no-store"})
+    assert cache.get(href) is None
+    cache.put(href, "{}", {})
+    assert cache.get(href) is None
+
+
+def test_stac_cache_evict(tmp_path: Path) -> None:
+    """Least recently used documents are evicted above the maximum size."""
+    cache = StacCache(tmp_path / "cache", max_size=1)
+    cache.put("https://example.com/a.json", "{}", {"ETag": '"a"'})
+    cache.put("https://example.com/b.json", "{}", {"ETag": '"b"'})
+    os.utime(cache.entry_path("https://example.com/a.json"), (0, 0))
+
+    assert cache.evict() > 0
+    assert cache.get("https://example.com/a.json") is None
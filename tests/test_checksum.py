@@ -0,0 +1,75 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Checksum module test."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from eoap_tools.checksum import (
+    ChecksumError,
+    copy_file,
+    decode_multihash,
+    encode_multihash,
+    file_checksum,
+    verify,
+)
+
+
+@pytest.mark.parametrize(
+    ("algorithm", "digest"),
+    [
+        ("sha2-256", hashlib.sha256(b"data").digest()),
+        ("md5", hashlib.md5(b"data").digest()),  # noqa: S324
+        ("blake2b-256", hashlib.blake2b(b"data", digest_size=32).digest()),
+    ],
+)
+def test_multihash(algorithm: str, digest: bytes) -> None:
+    """Multihash encoding and decoding roundtrip."""
+    assert decode_multihash(encode_multihash(algorithm, digest)) == (algorithm, digest)
+
+
+def test_decode_multihash_invalid() -> None:
+    """Invalid multihash raise ValueError."""
+    with pytest.raises(ValueError, match="multihash"):
+        decode_multihash("1220abcd")
+    with pytest.raises(ValueError, match="multihash"):
+        decode_multihash("not hex")
+
+
+def test_copy_file(tmp_path: Path) -> None:
+    """Files are hashed while copied."""
+    src = tmp_path / "src"
+    src.write_bytes(b"data" * 1000)
+
+    checksum = copy_file(src, tmp_path / "dst")
+
+    assert (tmp_path / "dst").read_bytes() == src.read_bytes()
+    assert checksum == "1220" + hashlib.sha256(b"data" * 1000).hexdigest()
+    assert checksum == file_checksum(src)
+
+
+def test_verify(tmp_path: Path) -> None:
+    """Files are verified against checksum and size."""
+    path = tmp_path / "file"
+    path.write_bytes(b"data")
+    checksum = "1220" + hashlib.sha256(b"data").hexdigest()
+
+    verify(path, checksum, 4)
+    with pytest.raises(ChecksumError, match="size"):
+        verify(path, checksum, 5)
+    with pytest.raises(ChecksumError, match="checksum"):
+        verify(path, "1220" + hashlib.sha256(b"other").hexdigest(), None)
@@ -14,7 +14,11 @@
 
 """CLI test."""
 
+import json
+import subprocess
+import sys
 from importlib.metadata import metadata
+from pathlib import Path
 
 from click.testing import CliRunner
 
@@ -22,6 +26,10 @@ from eoap_tools._cli import main
 
 runner = CliRunner()
 
+# Generous budget, importing DVC alone takes several times longer.
+IMPORT_TIME_BUDGET_US = 250_000
+HEAVY_MODULES = ("dvc", "git", "pystac", "requests")
+
 
 def test_cli() -> None:
     """Running CLI without argument print help."""
@@ -43,3 +51,59 @@ def test_cli_version() -> None:
     assert pkg_name in result.stdout
     assert pkg_version in result.stdout
     assert pkg_summary in result.stdout
+
+
+def test_cli_import_time() -> None:
+    """Importing the CLI does not import the heavy dependencies of its commands."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", "import eoap_tools._cli"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines are "import time: self [us] | cumulative | imported package".
+    imports = {}
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        imports[name.strip()] = int(cumulative)
+
+    heavy = [m for m in imports if m.split(".")[0] in HEAVY_MODULES]
+    assert heavy == []
+    assert imports["eoap_tools._cli"] < IMPORT_TIME_BUDGET_US
+
+
+def test_cli_metrics_file(tmp_path: Path) -> None:
+    """A performance report of the command is written."""
+    assets_path = tmp_path / "assets"
+    assets_path.mkdir()
+    (assets_path / "B02.tif").write_bytes(b"B02")
+    metrics_path = tmp_path / "metrics.json"
+
+    result = runner.invoke(
+        main,
+        [
+            "--metrics-file",
+            str(metrics_path),
+            "stac",
+            "generate-catalog",
+            str(assets_path),
+            "--output",
+            str(tmp_path / "catalog"),
+        ],
+    )
+
+    assert result.exit_code == 0
+    report = json.loads(metrics_path.read_text())
+    assert report["command"] == "stac generate-catalog"
+    assert {"asset_materialize", "catalog_write"} <= set(report["phases"])
+    assert report["counters"]["bytes_materialized"] == 3
+
+
+def test_cli_profile(tmp_path: Path) -> None:
+    """The command is profiled."""
+    profile_path = tmp_path / "version.prof"
+
+    result = runner.invoke(main, ["--profile", str(profile_path), "version"])
+
+    assert result.exit_code == 0
+    assert profile_path.stat().st_size > 0
@@ -0,0 +1,219 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Download module test."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from eoap_tools.checksum import ChecksumError
+from eoap_tools.download import TransferOptions, download_file
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_file_segmented(
+    tmp_path: Path,
+    http_dir: Path,
+    http_server: str,
+    request: pytest.FixtureRequest,
+    ranges: bool,
+) -> None:
+    """Large files are downloaded by ranges, or in one stream as fallback."""
+    if not ranges:
+        request.getfixturevalue("http_no_ranges")
+    data = os.urandom(10_500)
+    (http_dir / "large.bin").write_bytes(data)
+    dest_path = tmp_path / "large.bin"
+
+    options = TransferOptions(segment_size=1000, segments=3)
+    download_file(f"{http_server}/large.bin", dest_path, options)
+
+    assert dest_path.read_bytes() == data
+
+
+def test_download_file_small(tmp_path: Path, http_dir: Path, http_server: str) -> None:
+    """Files smaller than one segment are downloaded with the first request."""
+    (http_dir / "small.bin").write_bytes(b"small")
+    dest_path = tmp_path / "small.bin"
+
+    download_file(f"{http_server}/small.bin", dest_path, TransferOptions())
+
+    assert dest_path.read_bytes() == b"small"
+
+
+def test_download_file_empty(tmp_path: Path, http_dir: Path, http_server: str) -> None:
+    """Empty files, whose ranges are not satisfiable, are downloaded."""
+    (http_dir / "empty.bin").write_bytes(b"")
+    dest_path = tmp_path / "empty.bin"
+
+    download_file(f"{http_server}/empty.bin", dest_path, TransferOptions())
+
+    assert dest_path.read_bytes() == b""
+
+
+def _etag(path: Path) -> str:
+    return f'"{path.stat().st_mtime_ns}-{path.stat().st_size}"'
+
+
+def test_download_file_resume_stream(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """A partial download is completed from its current size."""
+    data = os.urandom(5000)
+    (http_dir / "file.bin").write_bytes(data)
+    href = f"{http_server}/file.bin"
+    dest_path = tmp_path / "file.bin"
+    # Partial content differs from the remote to check it is kept as is.
+    (tmp_path / "file.bin.part").write_bytes(bytes(2000))
+    (tmp_path / "file.bin.part.json").write_text(
+        json.dumps({"href": href, "etag": _etag(http_dir / "file.bin")})
+    )
+
+    options = TransferOptions(segments=1, resume=True)
+    download_file(href, dest_path, options)
+
+    assert dest_path.read_bytes() == bytes(2000) + data[2000:]
+    assert not (tmp_path / "file.bin.part.json").exists()
+
+
+def test_download_file_resume_changed(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """A partial download of another version of the file is restarted."""
+    data = os.urandom(5000)
+    (http_dir / "file.bin").write_bytes(data)
+    href = f"{http_server}/file.bin"
+    dest_path = tmp_path / "file.bin"
+    (tmp_path / "file.bin.part").write_bytes(bytes(2000))
+    (tmp_path / "file.bin.part.json").write_text(
+        json.dumps({"href": href, "etag": '"outdated"'})
+    )
+
+    options = TransferOptions(segments=1, resume=True)
+    download_file(href, dest_path, options)
+
+    assert dest_path.read_bytes() == data
+
+
+@pytest.mark.parametrize(("part_size", "kept"), [(5000, True), (6000, False)])
+def test_download_file_resume_unsatisfiable(
+    tmp_path: Path, http_dir: Path, http_server: str, part_size: int, kept: bool
+) -> None:
+    """A partial download of unknown size is finalized if complete, else restarted."""
+    data = os.urandom(5000)
+    (http_dir / "file.bin").write_bytes(data)
+    href = f"{http_server}/file.bin"
+    dest_path = tmp_path / "file.bin"
+    (tmp_path / "file.bin.part").write_bytes(bytes(part_size))
+    (tmp_path / "file.bin.part.json").write_text(
+        json.dumps({"href": href, "etag": _etag(http_dir / "file.bin")})
+    )
+
+    options = TransferOptions(segments=1, resume=True)
+    download_file(href, dest_path, options)
+
+    assert dest_path.read_bytes() == (bytes(5000) if kept else data)
+    assert not (tmp_path / "file.bin.part.json").exists()
+
+
+def test_download_file_resume_segmented(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Only the missing segments of a partial segmented download are fetched."""
+    data = os.urandom(5000)
+    (http_dir / "file.bin").write_bytes(data)
+    href = f"{http_server}/file.bin"
+    dest_path = tmp_path / "file.bin"
+    (tmp_path / "file.bin.part").write_bytes(bytes(5000))
+    (tmp_path / "file.bin.part.json").write_text(
+        json.dumps(
+            {
+                "href": href,
+                "etag": _etag(http_dir / "file.bin"),
+                "size": 5000,
+                "segment_size": 1000,
+                "segments_done": [0, 2],
+            }
+        )
+    )
+
+    options = TransferOptions(segment_size=1000, segments=2, resume=True)
+    download_file(href, dest_path, options)
+
+    expected = bytes(1000) + data[1000:2000] + bytes(1000) + data[3000:]
+    assert dest_path.read_bytes() == expected
+
+
+@pytest.mark.parametrize("segments", [1, 3])
+def test_download_file_checksum(
+    tmp_path: Path, http_dir: Path, http_server: str, segments: int
+) -> None:
+    """The checksum is computed while downloading and verified."""
+    data = os.urandom(10_500)
+    (http_dir / "file.bin").write_bytes(data)
+    checksum = "1220" + hashlib.sha256(data).hexdigest()
+    options = TransferOptions(segment_size=1000, segments=segments)
+
+    computed = download_file(
+        f"{http_server}/file.bin", tmp_path / "file.bin", options, checksum=checksum
+    )
+    assert computed == checksum
+
+    with pytest.raises(ChecksumError):
+        download_file(
+            f"{http_server}/file.bin",
+            tmp_path / "bad.bin",
+            options,
+            checksum="1220" + hashlib.sha256(b"bad").hexdigest(),
+        )
+    assert list(tmp_path.glob("bad.bin*")) == []
+
+
+@pytest.mark.parametrize("checksum", ["1e20" + "ab" * 32, "not-hex"])
+def test_download_file_unsupported_checksum(
+    tmp_path: Path,
+    http_dir: Path,
+    http_server: str,
+    caplog: pytest.LogCaptureFixture,
+    checksum: str,
+) -> None:
+    """Unsupported checksums are not verified, sizes are."""
+    data = os.urandom(10_500)
+    (http_dir / "file.bin").write_bytes(data)
+    options = TransferOptions(segment_size=1000, segments=3)
+
+    computed = download_file(
+        f"{http_server}/file.bin",
+        tmp_path / "file.bin",
+        options,
+        checksum=checksum,
+        size=len(data),
+    )
+    assert computed is None
+    assert (tmp_path / "file.bin").read_bytes() == data
+    assert "checksum not verified" in caplog.text
+
+    with pytest.raises(ChecksumError, match="size mismatch"):
+        download_file(
+            f"{http_server}/file.bin",
+            tmp_path / "bad.bin",
+            options,
+            checksum=checksum,
+            size=len(data) + 1,
+        )
+    assert list(tmp_path.glob("bad.bin*")) == []
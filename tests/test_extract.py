@@ -0,0 +1,117 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Extract module test."""
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from eoap_tools.checksum import ChecksumError, file_checksum
+from eoap_tools.extract import extract_archive
+
+MEMBERS = {"product/manifest.xml": b"<manifest/>", "product/B02.jp2": bytes(100_000)}
+
+
+def write_tar(path: Path, mode: str = "w:gz") -> Path:
+    """Write an archive of `MEMBERS`."""
+    with tarfile.open(path, mode) as tar:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def write_zip(path: Path) -> Path:
+    """Write a zip archive of `MEMBERS`."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    return path
+
+
+def assert_extracted(path: Path) -> None:
+    """Check `MEMBERS` were extracted in `path`, and nothing else."""
+    files = {
+        p.relative_to(path).as_posix(): p.read_bytes()
+        for p in path.rglob("*")
+        if p.is_file()
+    }
+    assert files == MEMBERS
+
+
+def test_extract_tar(tmp_path: Path, http_dir: Path, http_server: str) -> None:
+    """A tar.gz archive is extracted from the download stream and verified."""
+    archive_path = write_tar(http_dir / "product.tar.gz")
+    checksum = file_checksum(archive_path)
+    size = archive_path.stat().st_size
+    output_path = tmp_path / "output"
+
+    extracted = extract_archive(
+        f"{http_server}/product.tar.gz", output_path / "product", checksum, size
+    )
+
+    assert extracted == sum(len(data) for data in MEMBERS.values())
+    assert_extracted(output_path / "product")
+    assert [p.name for p in output_path.iterdir()] == ["product"]
+
+
+def test_extract_tar_checksum_mismatch(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """An archive not matching its checksum is not kept."""
+    archive_path = write_tar(http_dir / "product.tar", "w")
+    checksum = file_checksum(archive_path)
+    archive_path.write_bytes(archive_path.read_bytes() + bytes(512))
+
+    output_path = tmp_path / "output"
+
+    with pytest.raises(ChecksumError):
+        extract_archive(f"{http_server}/product.tar", output_path / "product", checksum)
+
+    assert list(output_path.iterdir()) == []
+
+
+def test_extract_tar_zstd(tmp_path: Path) -> None:
+    """A zstd compressed tar archive is decompressed while extracted."""
+    zstandard = pytest.importorskip("zstandard")
+    tar_path = write_tar(tmp_path / "product.tar", "w")
+    zst_path = tmp_path / "product.tar.zst"
+    zst_path.write_bytes(zstandard.ZstdCompressor().compress(tar_path.read_bytes()))
+
+    extract_archive(str(zst_path), tmp_path / "product")
+
+    assert_extracted(tmp_path / "product")
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_extract_zip(
+    tmp_path: Path,
+    http_dir: Path,
+    http_server: str,
+    request: pytest.FixtureRequest,
+    ranges: bool,
+) -> None:
+    """A zip archive is read with byte ranges, or spooled without range support."""
+    write_zip(http_dir / "product.zip")
+    if not ranges:
+        request.getfixturevalue("http_no_ranges")
+
+    extract_archive(f"{http_server}/product.zip", tmp_path / "product")
+
+    assert_extracted(tmp_path / "product")
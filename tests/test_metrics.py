@@ -0,0 +1,60 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Metrics module test."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from eoap_tools.metrics import Metrics
+
+
+def test_metrics_report(tmp_path: Path) -> None:
+    """Phases, counters and transfers are reported."""
+    metrics = Metrics()
+
+    def work() -> None:
+        with metrics.phase("transfer"):
+            time.sleep(0.01)
+        metrics.count("bytes_downloaded", 100)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.add_transfer("B02", 0.5, 100)
+    metrics.write_report(tmp_path / "metrics.json")
+
+    report = json.loads((tmp_path / "metrics.json").read_text())
+    assert report["phases"]["transfer"]["count"] == 4
+    assert report["phases"]["transfer"]["seconds"] >= 0.04
+    assert report["counters"] == {"bytes_downloaded": 400}
+    assert report["throughput"]["bytes_downloaded"] > 0
+    assert report["transfers"] == [{"name": "B02", "seconds": 0.5, "bytes": 100}]
+    assert report["peak_rss"] > 0
+
+
+def test_metrics_phase_decorator() -> None:
+    """Phases also time decorated functions."""
+    metrics = Metrics()
+
+    @metrics.phase("work")
+    def work() -> int:
+        return 1
+
+    assert work() + work() == 2
+    assert metrics.report()["phases"]["work"]["count"] == 2
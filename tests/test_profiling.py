@@ -0,0 +1,63 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Profiling module test."""
+
+import pstats
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from eoap_tools.profiling import Profiler
+
+
+def busy_function() -> bytes:
+    """Allocate memory and keep the CPU busy for a while."""
+    end = time.perf_counter() + 0.1
+    while time.perf_counter() < end:
+        pass
+    return bytes(1024**2)
+
+
+def test_profiler_pstats(tmp_path: Path) -> None:
+    """Profile stats and top memory allocators are written."""
+    profiler = Profiler(tmp_path / "run.prof", memory=True)
+    profiler.start()
+    data = busy_function()
+    profiler.stop()
+
+    stats = pstats.Stats(str(tmp_path / "run.prof"))
+    assert "busy_function" in stats.get_stats_profile().func_profiles
+    memory = (tmp_path / "run.prof.memory.txt").read_text()
+    assert memory.startswith("Peak traced memory: ")
+    assert "test_profiling.py" in memory
+    assert len(data) == 1024**2
+
+
+def test_profiler_collapsed(tmp_path: Path) -> None:
+    """Stacks of pool threads are sampled, grouped by pool name."""
+    profiler = Profiler(tmp_path / "run.folded")
+    profiler.start()
+    with ThreadPoolExecutor(2, thread_name_prefix="asset") as executor:
+        list(executor.map(lambda _: busy_function(), range(2)))
+    profiler.stop()
+
+    lines = (tmp_path / "run.folded").read_text().splitlines()
+    samples = {}
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        samples[stack] = int(count)
+    busy = [s for s in samples if s.startswith("asset;") and "busy_function" in s]
+    assert busy
+    assert sum(samples[s] for s in busy) > 5
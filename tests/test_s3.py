@@ -0,0 +1,118 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""S3 module test."""
+
+import datetime
+from collections.abc import Iterator
+from pathlib import Path
+
+import pystac
+import pytest
+
+from eoap_tools.checksum import ChecksumError, encode_multihash, file_checksum
+from eoap_tools.download import TransferOptions, download_file
+from eoap_tools.metrics import get_metrics
+from eoap_tools.s3 import configure_s3, get_s3_client
+from eoap_tools.stac import prepare_assets
+
+moto = pytest.importorskip("moto")
+
+DATA = bytes(range(256)) * 1000
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Mocked S3 bucket with object "data.bin", yield the bucket name."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        configure_s3()
+        client = get_s3_client()
+        client.create_bucket(Bucket="bucket")
+        client.put_object(Bucket="bucket", Key="data.bin", Body=DATA)
+        yield "bucket"
+    configure_s3()
+
+
+def test_download_s3_segmented(tmp_path: Path, s3_bucket: str) -> None:
+    """Objects are downloaded with parallel byte ranges and verified."""
+    dest_path = tmp_path / "data.bin"
+    source_path = tmp_path / "source.bin"
+    source_path.write_bytes(DATA)
+    checksum = file_checksum(source_path)
+    options = TransferOptions(segment_size=10_000, segments=4)
+
+    computed = download_file(
+        f"s3://{s3_bucket}/data.bin", dest_path, options, checksum, len(DATA)
+    )
+
+    assert computed == checksum
+    assert dest_path.read_bytes() == DATA
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.bin", "source.bin"]
+
+
+def test_download_s3_checksum_mismatch(tmp_path: Path, s3_bucket: str) -> None:
+    """A download not matching its checksum is removed."""
+    checksum = encode_multihash("sha2-256", bytes(32))
+
+    with pytest.raises(ChecksumError):
+        download_file(
+            f"s3://{s3_bucket}/data.bin",
+            tmp_path / "data.bin",
+            TransferOptions(),
+            checksum,
+        )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prepare_assets_s3(tmp_path: Path, s3_bucket: str) -> None:
+    """s3:// assets are downloaded, and skipped once downloaded on resume."""
+    item = pystac.Item(
+        id="item",
+        geometry=None,
+        bbox=None,
+        datetime=datetime.datetime.now(tz=datetime.UTC),
+        properties={},
+    )
+    item.add_asset("data", pystac.Asset(href=f"s3://{s3_bucket}/data.bin"))
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    catalog.add_item(item)
+    catalog_path = tmp_path / "catalog"
+    catalog.normalize_and_save(
+        str(catalog_path), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+    output_path = tmp_path / "output"
+    options = TransferOptions(resume=True)
+    skipped = get_metrics().counters["assets_skipped"]
+
+    errors = prepare_assets(str(catalog_path), output_path, options=options)
+    errors_resumed = prepare_assets(str(catalog_path), output_path, options=options)
+
+    assert errors == errors_resumed == {}
+    assert (output_path / "data").read_bytes() == DATA
+    assert get_metrics().counters["assets_skipped"] == skipped + 1
+
+
+def test_s3_session_token() -> None:
+    """Temporary credentials keep their session token."""
+    token = "token"  # noqa: S105
+    configure_s3(access_key_id="key", secret_access_key=token, session_token=token)
+    try:
+        credentials = get_s3_client()._request_signer._credentials  # noqa: SLF001
+        assert credentials.token == token
+    finally:
+        configure_s3()
@@ -0,0 +1,96 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Session module test."""
+
+import datetime
+from pathlib import Path
+
+import pystac
+
+from eoap_tools.cache import StacCache
+from eoap_tools.metrics import get_metrics
+from eoap_tools.session import SessionStacIO, create_session, get_session
+
+
+def test_get_session_shared() -> None:
+    """The same session is returned on each call."""
+    assert get_session() is get_session()
+
+
+def test_session_retry(
+    http_dir: Path, http_server: str, http_failures: dict[str, int]
+) -> None:
+    """Transient server errors are retried."""
+    (http_dir / "file.txt").write_text("content")
+    http_failures["/file.txt"] = 1
+    retries = get_metrics().counters["http_retries"]
+
+    response = create_session().get(f"{http_server}/file.txt")
+
+    assert response.status_code == 200
+    assert response.text == "content"
+    assert http_failures["/file.txt"] == 0
+    assert get_metrics().counters["http_retries"] == retries + 1
+
+
+def test_session_retry_exhausted(
+    http_dir: Path, http_server: str, http_failures: dict[str, int]
+) -> None:
+    """The last error response is returned once retries are exhausted."""
+    (http_dir / "file.txt").write_text("content")
+    http_failures["/file.txt"] = 2
+
+    response = create_session(retries=1).get(f"{http_server}/file.txt")
+
+    assert response.status_code == 503
+
+
+def test_session_stac_io(http_dir: Path, http_server: str) -> None:
+    """Remote STAC files are read through the session."""
+    item = pystac.Item(
+        id="item",
+        geometry=None,
+        bbox=None,
+        datetime=datetime.datetime.now(tz=datetime.UTC),
+        properties={},
+    )
+    pystac.write_file(item, include_self_link=False, dest_href=http_dir / "item.json")
+
+    read_item = pystac.read_file(f"{http_server}/item.json", stac_io=SessionStacIO())
+
+    assert isinstance(read_item, pystac.Item)
+    assert read_item.id == "item"
+
+
+def test_session_stac_io_cache(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Cached STAC files are revalidated, and used without request while fresh."""
+    (http_dir / "catalog.json").write_text('{"id": "v1"}')
+    href = f"{http_server}/catalog.json"
+    cache = StacCache(tmp_path / "cache")
+    stac_io = SessionStacIO(cache=cache)
+    counters = get_metrics().counters
+    revalidations = counters["stac_cache_revalidations"]
+
+    assert stac_io.read_json(href) == {"id": "v1"}
+    assert stac_io.read_json(href) == {"id": "v1"}
+    assert counters["stac_cache_revalidations"] == revalidations + 1
+
+    (http_dir / "catalog.json").write_text('{"id": "v2"}')
+    assert stac_io.read_json(href) == {"id": "v2"}
+
+    cache.put(href, '{"id": "fresh"}', {"Cache-Control": "max-age=60"})
+    assert stac_io.read_json(href) == {"id": "fresh"}
@@ -0,0 +1,612 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""STAC module test."""
+
+import datetime
+import hashlib
+import json
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pystac
+import pytest
+
+from eoap_tools.cache import AssetCache
+from eoap_tools.checksum import ChecksumError
+from eoap_tools.download import TransferOptions
+from eoap_tools.metrics import get_metrics
+from eoap_tools.stac import (
+    SYNC_INDEX_NAME,
+    AssetFilter,
+    generate_catalog,
+    prepare_assets,
+    search_items,
+    walk_items,
+)
+
+
+def write_catalog(
+    path: Path, assets: dict[str, str], fields: dict[str, dict[str, Any]] | None = None
+) -> Path:
+    """Write a STAC catalog with one item referencing `assets` hrefs."""
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    item = pystac.Item(
+        id="item",
+        geometry=None,
+        bbox=None,
+        datetime=datetime.datetime.now(tz=datetime.UTC),
+        properties={},
+    )
+    for key, href in assets.items():
+        extra_fields = (fields or {}).get(key)
+        item.add_asset(key, pystac.Asset(href=href, extra_fields=extra_fields))
+    catalog.add_item(item)
+    catalog.normalize_and_save(
+        str(path), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+    return path
+
+
+def test_prepare_assets(tmp_path: Path, http_dir: Path, http_server: str) -> None:
+    """Remote and local assets are transferred to output."""
+    for band in ("B02", "B03", "B04"):
+        (http_dir / f"{band}.tif").write_bytes(band.encode() * 1000)
+    local_asset = tmp_path / "metadata.xml"
+    local_asset.write_text("<metadata/>")
+    assets = {band: f"{http_server}/{band}.tif" for band in ("B02", "B03", "B04")}
+    assets["metadata"] = str(local_asset)
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(str(catalog_path), output_path, jobs=2, host_jobs=1)
+
+    assert errors == {}
+    for band in ("B02", "B03", "B04"):
+        assert (output_path / band).read_bytes() == band.encode() * 1000
+    assert (output_path / "metadata.xml").read_text() == "<metadata/>"
+
+
+def test_prepare_assets_collect_errors(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """A failing asset does not prevent the others from being transferred."""
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    assets = {"B02": f"{http_server}/B02.tif", "B03": f"{http_server}/B03.tif"}
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(str(catalog_path), output_path)
+
+    assert list(errors) == ["B03"]
+    assert (output_path / "B02").read_bytes() == b"B02"
+    assert not (output_path / "B03").exists()
+
+
+def test_prepare_assets_resume(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Completed assets are skipped when resuming."""
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    (http_dir / "B03.tif").write_bytes(b"B03")
+    assets = {"B02": f"{http_server}/B02.tif", "B03": f"{http_server}/B03.tif"}
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+    output_path.mkdir()
+    (output_path / "B02").write_bytes(b"old")
+
+    options = TransferOptions(resume=True)
+    errors = prepare_assets(str(catalog_path), output_path, options=options)
+
+    assert errors == {}
+    assert (output_path / "B02").read_bytes() == b"old"
+    assert (output_path / "B03").read_bytes() == b"B03"
+
+
+def test_prepare_assets_sync(
+    tmp_path: Path,
+    http_dir: Path,
+    http_server: str,
+    http_failures: dict[str, int],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Only assets changed since the previous sync are transferred again."""
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    (http_dir / "B03.tif").write_bytes(b"B03")
+    (tmp_path / "B04.tif").write_bytes(b"B04")
+    assets = {
+        "B02": f"{http_server}/B02.tif",
+        "B03": f"{http_server}/B03.tif",
+        "B04": str(tmp_path / "B04.tif"),
+    }
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+    options = TransferOptions(sync=True)
+    assert prepare_assets(str(catalog_path), output_path, options=options) == {}
+    mtimes = {path.name: path.stat().st_mtime_ns for path in output_path.iterdir()}
+
+    (http_dir / "B03.tif").write_bytes(b"B03 v2")
+    # Unchanged remote assets are checked without GET requests.
+    http_failures["/B02.tif"] = 1
+    caplog.set_level("INFO", logger="eoap_tools.stac")
+    assert prepare_assets(str(catalog_path), output_path, options=options) == {}
+
+    assert http_failures["/B02.tif"] == 1
+    assert "sync: 2 assets skipped (6 bytes), 1 fetched (6 bytes)" in caplog.text
+    assert (output_path / "B03").read_bytes() == b"B03 v2"
+    assert (output_path / "B02").stat().st_mtime_ns == mtimes["B02"]
+    assert (output_path / "B04.tif").stat().st_mtime_ns == mtimes["B04.tif"]
+
+
+def test_prepare_assets_sync_existing(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Up to date copies not transferred by a sync are recorded."""
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    (tmp_path / "B04.tif").write_bytes(b"B04")
+    assets = {"B02": f"{http_server}/B02.tif", "B04": str(tmp_path / "B04.tif")}
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+    assert prepare_assets(str(catalog_path), output_path) == {}
+    mtimes = {path.name: path.stat().st_mtime_ns for path in output_path.iterdir()}
+
+    options = TransferOptions(sync=True)
+    assert prepare_assets(str(catalog_path), output_path, options=options) == {}
+
+    entries = json.loads((output_path / SYNC_INDEX_NAME).read_text())
+    assert sorted(entries) == ["B02", "B04.tif"]
+    assert (output_path / "B02").stat().st_mtime_ns == mtimes["B02"]
+    assert (output_path / "B04.tif").stat().st_mtime_ns == mtimes["B04.tif"]
+
+
+def test_prepare_assets_cache(tmp_path: Path, http_dir: Path, http_server: str) -> None:
+    """Cached assets are not downloaded again."""
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    assets = {"B02": f"{http_server}/B02.tif"}
+    fields = {"B02": {"file:checksum": "1220" + hashlib.sha256(b"B02").hexdigest()}}
+    catalog_path = write_catalog(tmp_path / "catalog", assets, fields)
+    cache = AssetCache(tmp_path / "cache")
+
+    errors = prepare_assets(str(catalog_path), tmp_path / "output1", cache=cache)
+    assert errors == {}
+    (http_dir / "B02.tif").unlink()
+    errors = prepare_assets(str(catalog_path), tmp_path / "output2", cache=cache)
+
+    assert errors == {}
+    assert (tmp_path / "output2" / "B02").read_bytes() == b"B02"
+
+
+def test_prepare_assets_verify(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Assets not matching their checksum or size fail."""
+    for band in ("B02", "B03", "B04"):
+        (http_dir / f"{band}.tif").write_bytes(band.encode())
+    local_asset = tmp_path / "B05.tif"
+    local_asset.write_bytes(b"B05")
+    assets = {band: f"{http_server}/{band}.tif" for band in ("B02", "B03", "B04")}
+    assets["B05"] = str(local_asset)
+    fields = {
+        "B02": {"file:checksum": "1220" + hashlib.sha256(b"B02").hexdigest()},
+        "B03": {"file:checksum": "1220" + hashlib.sha256(b"bad").hexdigest()},
+        "B04": {"file:size": 10},
+        "B05": {"file:checksum": "1220" + hashlib.sha256(b"bad").hexdigest()},
+    }
+    catalog_path = write_catalog(tmp_path / "catalog", assets, fields)
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(str(catalog_path), output_path)
+
+    assert sorted(errors) == ["B03", "B04", "B05"]
+    assert all(isinstance(e, ChecksumError) for e in errors.values())
+    assert sorted(p.name for p in output_path.iterdir()) == ["B02"]
+
+
+@pytest.mark.parametrize(
+    ("asset_filter", "selected"),
+    [
+        (AssetFilter(), True),
+        (AssetFilter(keys=("B0*",)), True),
+        (AssetFilter(keys=("SCL", "thumbnail")), False),
+        (AssetFilter(roles=("data",)), True),
+        (AssetFilter(roles=("thumbnail",)), False),
+        (AssetFilter(media_types=("image/tiff",)), True),
+        (AssetFilter(media_types=("image/*",)), True),
+        (AssetFilter(media_types=("application/xml",)), False),
+        (AssetFilter(max_size=1000), True),
+        (AssetFilter(max_size=999), False),
+        (AssetFilter(keys=("B02",), roles=("metadata",)), False),
+    ],
+)
+def test_asset_filter(asset_filter: AssetFilter, selected: bool) -> None:
+    """Assets are selected if they match every criterion."""
+    asset = pystac.Asset(
+        href="B02.tif",
+        media_type="image/tiff; application=geotiff; profile=cloud-optimized",
+        roles=["data", "reflectance"],
+        extra_fields={"file:size": 1000},
+    )
+
+    assert asset_filter.selects("B02", asset) is selected
+
+
+def test_prepare_assets_filter(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Unselected assets are not downloaded."""
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    assets = {"B02": f"{http_server}/B02.tif", "thumbnail": f"{http_server}/T.png"}
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+
+    asset_filter = AssetFilter(keys=("B*",))
+    errors = prepare_assets(str(catalog_path), output_path, asset_filter=asset_filter)
+
+    assert errors == {}
+    assert sorted(p.name for p in output_path.iterdir()) == ["B02"]
+
+
+@pytest.mark.parametrize("remote", [True, False])
+def test_prepare_assets_extract(
+    tmp_path: Path, http_dir: Path, http_server: str, remote: bool
+) -> None:
+    """Archive assets are extracted in a directory, other assets downloaded."""
+    with zipfile.ZipFile(http_dir / "product.zip", "w") as archive:
+        archive.writestr("product/manifest.xml", "<manifest/>")
+    (http_dir / "B02.tif").write_bytes(b"B02")
+    assets = {
+        "product": f"{http_server if remote else http_dir}/product.zip",
+        "B02": f"{http_server}/B02.tif",
+    }
+    catalog_path = write_catalog(tmp_path / "catalog", assets)
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(
+        str(catalog_path), output_path, options=TransferOptions(extract=True)
+    )
+
+    assert errors == {}
+    assert sorted(p.name for p in output_path.iterdir()) == ["B02", "product"]
+    manifest_path = output_path / "product" / "product" / "manifest.xml"
+    assert manifest_path.read_text() == "<manifest/>"
+    assert (output_path / "B02").read_bytes() == b"B02"
+
+
+def write_nested_catalog(path: Path, assets_href: str) -> Path:
+    """Write a catalog with a root item and two items in a child collection."""
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    collection = pystac.Collection(
+        id="collection",
+        description="Test collection.",
+        extent=pystac.Extent(
+            pystac.SpatialExtent([[-180.0, -90.0, 180.0, 90.0]]),
+            pystac.TemporalExtent([[None, None]]),
+        ),
+    )
+    catalog.add_child(collection)
+    for parent, item_id in (
+        (catalog, "item1"),
+        (collection, "item2"),
+        (collection, "item3"),
+    ):
+        item = pystac.Item(
+            id=item_id,
+            geometry=None,
+            bbox=None,
+            datetime=datetime.datetime.now(tz=datetime.UTC),
+            properties={},
+        )
+        item.add_asset("data", pystac.Asset(href=f"{assets_href}/{item_id}.tif"))
+        parent.add_item(item)
+    catalog.normalize_and_save(
+        str(path), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+    return path
+
+
+def test_walk_items(http_dir: Path, http_server: str) -> None:
+    """Items of child catalogs are read from a remote catalog."""
+    write_nested_catalog(http_dir / "catalog", http_server)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        items = list(walk_items(f"{http_server}/catalog/catalog.json", executor))
+
+    assert sorted(item.id for item in items) == ["item1", "item2", "item3"]
+    item2 = next(item for item in items if item.id == "item2")
+    assert item2.self_href == f"{http_server}/catalog/collection/item2/item2.json"
+
+
+def test_prepare_assets_all_items(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """Every item of the catalog is prepared in its own directory."""
+    for item_id in ("item1", "item2", "item3"):
+        (http_dir / f"{item_id}.tif").write_bytes(item_id.encode())
+    catalog_path = write_nested_catalog(tmp_path / "catalog", http_server)
+    (http_dir / "item3.tif").unlink()
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(str(catalog_path), output_path, all_items=True)
+
+    assert list(errors) == ["item3/data"]
+    assert (output_path / "item1" / "data").read_bytes() == b"item1"
+    assert (output_path / "item2" / "data").read_bytes() == b"item2"
+
+
+def test_prepare_assets_all_items_broken_link(
+    tmp_path: Path, http_dir: Path, http_server: str
+) -> None:
+    """An unreadable child catalog is reported, other items are prepared."""
+    (http_dir / "item1.tif").write_bytes(b"item1")
+    catalog_path = write_nested_catalog(tmp_path / "catalog", http_server)
+    (catalog_path / "collection" / "collection.json").unlink()
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(str(catalog_path), output_path, all_items=True)
+
+    collection_href = str(catalog_path.absolute() / "collection" / "collection.json")
+    assert list(errors) == [collection_href]
+    assert isinstance(errors[collection_href], FileNotFoundError)
+    assert (output_path / "item1" / "data").read_bytes() == b"item1"
+
+
+def api_item(item_id: str, collection: str, assets: dict[str, str]) -> dict[str, Any]:
+    """Return the dict of a STAC API item referencing `assets` hrefs."""
+    item = pystac.Item(
+        id=item_id,
+        geometry=None,
+        bbox=None,
+        datetime=datetime.datetime.now(tz=datetime.UTC),
+        properties={},
+        collection=collection,
+    )
+    for key, href in assets.items():
+        item.add_asset(key, pystac.Asset(href=href))
+    return item.to_dict(include_self_link=False, transform_hrefs=False)
+
+
+def test_search_items(stac_api: str, stac_api_items: list[dict[str, Any]]) -> None:
+    """Search results are streamed page by page, at most `max_items`."""
+    stac_api_items.extend(api_item(f"item{i}", "s2", {}) for i in range(5))
+    stac_api_items.append(api_item("other", "l8", {}))
+    counters = get_metrics().counters
+    pages = counters["search_pages"]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        query = {"collections": ["s2"], "bbox": None, "limit": 2}
+        items = search_items(f"{stac_api}/search", query, executor)
+        assert [item.id for item in items] == [f"item{i}" for i in range(5)]
+        assert counters["search_pages"] == pages + 3
+
+        items = search_items(f"{stac_api}/search", query, executor, max_items=3)
+        assert [item.id for item in items] == ["item0", "item1", "item2"]
+        assert counters["search_pages"] == pages + 5
+
+
+def test_prepare_assets_search(
+    tmp_path: Path,
+    http_dir: Path,
+    http_server: str,
+    stac_api: str,
+    stac_api_items: list[dict[str, Any]],
+) -> None:
+    """Assets of searched items are prepared by item."""
+    for i in range(3):
+        (http_dir / f"B0{i}.tif").write_bytes(b"B0%d" % i)
+        assets = {"B02": f"{http_server}/B0{i}.tif"}
+        stac_api_items.append(api_item(f"item{i}", "s2", assets))
+    output_path = tmp_path / "output"
+
+    errors = prepare_assets(
+        stac_api, output_path, search={"collections": ["s2"], "limit": 2}
+    )
+
+    assert errors == {}
+    for i in range(3):
+        assert (output_path / f"item{i}" / "B02").read_bytes() == b"B0%d" % i
+
+
+def test_generate_catalog(tmp_path: Path) -> None:
+    """Assets are copied and cataloged with their size and checksum."""
+    assets_path = tmp_path / "assets"
+    assets_path.mkdir()
+    (assets_path / "result.tif").write_bytes(b"result")
+    (assets_path / "report.json").write_text("{}")
+    catalog_path = tmp_path / "catalog"
+
+    generate_catalog(assets_path, catalog_path, jobs=2)
+
+    catalog = pystac.Catalog.from_file(catalog_path / "catalog.json")
+    item = next(catalog.get_items())
+    assert sorted(item.assets) == ["report.json", "result.tif"]
+    asset = item.assets["result.tif"]
+    assert asset.media_type == "image/tiff"
+    assert asset.extra_fields["file:size"] == 6
+    assert asset.extra_fields["file:checksum"] == (
+        "1220" + hashlib.sha256(b"result").hexdigest()
+    )
+    assert Path(asset.get_absolute_href() or "").read_bytes() == b"result"
+
+
+def test_generate_catalog_link_mode(tmp_path: Path) -> None:
+    """Assets are linked in the catalog, with their checksum."""
+    assets_path = tmp_path / "assets"
+    assets_path.mkdir()
+    (assets_path / "result.tif").write_bytes(b"result")
+    catalog_path = tmp_path / "catalog"
+
+    generate_catalog(assets_path, catalog_path, link_mode="hardlink")
+
+    catalog = pystac.Catalog.from_file(catalog_path / "catalog.json")
+    asset = next(catalog.get_items()).assets["result.tif"]
+    assert Path(asset.get_absolute_href() or "").samefile(assets_path / "result.tif")
+    assert asset.extra_fields["file:checksum"] == (
+        "1220" + hashlib.sha256(b"result").hexdigest()
+    )
+
+
+def test_generate_catalog_recursive(tmp_path: Path) -> None:
+    """Subdirectories are cataloged as separate items."""
+    assets_path = tmp_path / "assets"
+    (assets_path / "tiles" / "a").mkdir(parents=True)
+    (assets_path / "tiles" / "b").mkdir(parents=True)
+    (assets_path / "report.json").write_text("{}")
+    (assets_path / "tiles" / "a" / "tile.tif").write_bytes(b"a")
+    (assets_path / "tiles" / "b" / "tile.tif").write_bytes(b"b")
+    catalog_path = tmp_path / "catalog"
+
+    generate_catalog(assets_path, catalog_path, recursive=True)
+
+    catalog = pystac.Catalog.from_file(catalog_path / "catalog.json")
+    items = {item.id: item for item in catalog.get_items()}
+    assert sorted(items) == ["output", "tiles-a", "tiles-b"]
+    assert list(items["output"].assets) == ["report.json"]
+    asset = items["tiles-b"].assets["tile.tif"]
+    assert Path(asset.get_absolute_href() or "").read_bytes() == b"b"
+
+
+def test_generate_catalog_reproducible(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Parallel runs write the same catalog, whatever the order items complete."""
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    monkeypatch.setattr("eoap_tools.stac._new_catalog", lambda: catalog)
+    assets_path = tmp_path / "assets"
+    for i in range(20):
+        (assets_path / f"d{i}").mkdir(parents=True)
+        (assets_path / f"d{i}" / "tile.tif").write_bytes(bytes(1000 * (20 - i)))
+
+    for run in ("run1", "run2"):
+        generate_catalog(assets_path, tmp_path / run, jobs=8, recursive=True)
+
+    catalog_json = (tmp_path / "run1" / "catalog.json").read_bytes()
+    assert catalog_json == (tmp_path / "run2" / "catalog.json").read_bytes()
+    item_hrefs = [
+        link["href"]
+        for link in json.loads(catalog_json)["links"]
+        if link["rel"] == "item"
+    ]
+    assert item_hrefs == sorted(item_hrefs)
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [("a-b/x.tif", "a/b/x.tif"), ("x.tif", "output/y.tif")],
+)
+def test_generate_catalog_recursive_collision(
+    tmp_path: Path, first: str, second: str
+) -> None:
+    """Directories mapping to the same item id are rejected."""
+    assets_path = tmp_path / "assets"
+    for name in (first, second):
+        (assets_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (assets_path / name).write_bytes(b"data")
+
+    with pytest.raises(ValueError, match="both map to item"):
+        generate_catalog(assets_path, tmp_path / "catalog", recursive=True)
+
+
+def test_generate_catalog_item_pattern(tmp_path: Path) -> None:
+    """Files are grouped in items by pattern."""
+    assets_path = tmp_path / "assets"
+    assets_path.mkdir()
+    for name in ("T31TCJ_B02.tif", "T31TCJ_B03.tif", "T31TCK_B02.tif", "log.txt"):
+        (assets_path / name).write_bytes(name.encode())
+    catalog_path = tmp_path / "catalog"
+
+    generate_catalog(
+        assets_path, catalog_path, item_pattern=re.compile(r"^(?P<item>T\w+?)_")
+    )
+
+    catalog = pystac.Catalog.from_file(catalog_path / "catalog.json")
+    items = {item.id: sorted(item.assets) for item in catalog.get_items()}
+    assert items == {
+        "T31TCJ": ["T31TCJ_B02.tif", "T31TCJ_B03.tif"],
+        "T31TCK": ["T31TCK_B02.tif"],
+        "output": ["log.txt"],
+    }
+
+
+def test_generate_catalog_item_pattern_bounded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Files of an item found after those of too many other items are rejected."""
+    monkeypatch.setattr("eoap_tools.stac.MAX_OPEN_ITEMS", 1)
+    assets_path = tmp_path / "assets"
+    for name in ("a/T1_B02.tif", "a/T2_B02.tif", "b/T1_B03.tif"):
+        (assets_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (assets_path / name).write_bytes(b"data")
+
+    with pytest.raises(ValueError, match="files of item 'T1' found after"):
+        generate_catalog(
+            assets_path,
+            tmp_path / "catalog",
+            recursive=True,
+            item_pattern=re.compile(r"(T\d)_"),
+        )
+
+
+def test_generate_catalog_incremental(tmp_path: Path) -> None:
+    """Only changed assets are materialized, and only their items rewritten."""
+    assets_path = tmp_path / "assets"
+    for name in ("a", "b", "c"):
+        (assets_path / name).mkdir(parents=True)
+        (assets_path / name / "tile.tif").write_bytes(name.encode())
+    (assets_path / "a" / "meta.json").write_text("{}")
+    catalog_path = tmp_path / "catalog"
+    generate_catalog(assets_path, catalog_path, recursive=True, incremental=True)
+    catalog_id = pystac.Catalog.from_file(catalog_path / "catalog.json").id
+    stat_before = {
+        path.relative_to(catalog_path).as_posix(): path.stat().st_mtime_ns
+        for path in catalog_path.rglob("*")
+    }
+
+    (assets_path / "a" / "tile.tif").write_bytes(b"a2")
+    (assets_path / "b" / "tile.tif").unlink()
+    (assets_path / "d").mkdir()
+    (assets_path / "d" / "tile.tif").write_bytes(b"d")
+    generate_catalog(assets_path, catalog_path, recursive=True, incremental=True)
+
+    catalog = pystac.Catalog.from_file(catalog_path / "catalog.json")
+    items = {item.id: item for item in catalog.get_items()}
+    assert catalog.id == catalog_id
+    assert sorted(items) == ["a", "c", "d"]
+    assert not (catalog_path / "b").exists()
+    asset = items["a"].assets["tile.tif"]
+    assert Path(asset.get_absolute_href() or "").read_bytes() == b"a2"
+    assert asset.extra_fields["file:size"] == 2
+    assert items["a"].assets["meta.json"].extra_fields["file:size"] == 2
+    unchanged = ("a/meta.json", "c/c.json", "c/tile.tif")
+    for name in unchanged:
+        assert (catalog_path / name).stat().st_mtime_ns == stat_before[name]
+    assert (catalog_path / "a/a.json").stat().st_mtime_ns != stat_before["a/a.json"]
+
+
+@pytest.mark.parametrize("with_index", [True, False])
+def test_generate_catalog_incremental_rebuild(tmp_path: Path, with_index: bool) -> None:
+    """Items of a catalog generated with other options are removed."""
+    assets_path = tmp_path / "assets"
+    (assets_path / "t1").mkdir(parents=True)
+    (assets_path / "t1" / "x.tif").write_bytes(b"x")
+    catalog_path = tmp_path / "catalog"
+    generate_catalog(assets_path, catalog_path, recursive=True, incremental=with_index)
+
+    generate_catalog(assets_path, catalog_path, incremental=True)
+
+    catalog = pystac.Catalog.from_file(catalog_path / "catalog.json")
+    assert [item.id for item in catalog.get_items()] == ["output"]
+    assert not (catalog_path / "t1").exists()
@@ -0,0 +1,102 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utils module test."""
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from eoap_tools.utils import imap_bounded, is_url, link_file, parse_size, scan_files
+
+
+def test_is_url() -> None:
+    """Only HTTP(S) URLs are URLs."""
+    assert is_url("https://example.com/item.json")
+    assert not is_url("/data/item.json")
+    assert not is_url("s3://bucket/item.json")
+
+
+def test_parse_size_invalid() -> None:
+    """Invalid sizes raise ValueError."""
+    with pytest.raises(ValueError, match="invalid size"):
+        parse_size("12X")
+
+
+@pytest.mark.parametrize("mode", ["copy", "hardlink", "symlink"])
+def test_link_file(tmp_path: Path, mode: str) -> None:
+    """Files are materialized with the requested mode."""
+    src = tmp_path / "src"
+    src.write_bytes(b"data")
+    dst = tmp_path / "dst"
+
+    assert link_file(src, dst, mode) == mode
+
+    assert dst.read_bytes() == b"data"
+    assert dst.is_symlink() == (mode == "symlink")
+    assert dst.samefile(src) == (mode in ("hardlink", "symlink"))
+
+
+def test_link_file_auto(tmp_path: Path) -> None:
+    """Auto mode links the file when the filesystem allows it."""
+    src = tmp_path / "src"
+    src.write_bytes(b"data")
+    dst = tmp_path / "dst"
+
+    assert link_file(src, dst) in ("reflink", "hardlink")
+    assert dst.read_bytes() == b"data"
+
+
+def test_link_file_invalid(tmp_path: Path) -> None:
+    """Invalid modes raise ValueError."""
+    with pytest.raises(ValueError, match="invalid link mode"):
+        link_file(tmp_path / "src", tmp_path / "dst", "move")
+
+
+def test_scan_files(tmp_path: Path) -> None:
+    """Files are listed lazily, recursively if asked."""
+    (tmp_path / "b" / "c").mkdir(parents=True)
+    for path in ("a.txt", "b/b.txt", "b/c/c.txt", "d.txt"):
+        (tmp_path / path).write_text(path)
+
+    def relative(paths: list[Path]) -> list[str]:
+        return [path.relative_to(tmp_path).as_posix() for path in paths]
+
+    assert relative(list(scan_files(tmp_path))) == ["a.txt", "d.txt"]
+    assert relative(list(scan_files(tmp_path, recursive=True))) == [
+        "a.txt",
+        "d.txt",
+        "b/b.txt",
+        "b/c/c.txt",
+    ]
+
+
+def test_imap_bounded() -> None:
+    """All items are mapped, with a bounded number of pending tasks."""
+    consumed = []
+
+    def items() -> Iterator[int]:
+        for i in range(20):
+            consumed.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = imap_bounded(executor, lambda i: i * 2, items(), max_pending=3)
+        first = next(results)
+        assert len(consumed) <= 4
+        results_list = [first, *results]
+
+    assert sorted(results_list) == [(i, i * 2) for i in range(20)]
@@ -0,0 +1,95 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Catalog writer module test."""
+
+import datetime
+from pathlib import Path
+
+import pystac
+import pytest
+from pystac.extensions.file import FileExtension
+
+from eoap_tools.writer import CatalogWriter
+
+
+def make_item(item_id: str) -> pystac.Item:
+    """Create an item with one asset."""
+    item = pystac.Item(
+        id=item_id,
+        geometry=None,
+        bbox=None,
+        datetime=datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC),
+        properties={},
+    )
+    asset = pystac.Asset(href="data.tif", media_type=pystac.MediaType.COG)
+    item.add_asset("data", asset)
+    FileExtension.ext(asset, add_if_missing=True).size = 10
+    return item
+
+
+def test_catalog_writer_pystac_compatible(tmp_path: Path) -> None:
+    """Written files are identical to pystac normalize_and_save output."""
+    item_ids = [f"item-{i}" for i in range(10)]
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    for item_id in item_ids:
+        catalog.add_item(make_item(item_id))
+    catalog.normalize_and_save(
+        str(tmp_path / "pystac"), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    with CatalogWriter(tmp_path / "writer", catalog, jobs=3) as writer:
+        for item_id in item_ids:
+            writer.write_item(make_item(item_id))
+
+    pystac_files = sorted(
+        path.relative_to(tmp_path / "pystac")
+        for path in (tmp_path / "pystac").rglob("*.json")
+    )
+    writer_files = sorted(
+        path.relative_to(tmp_path / "writer")
+        for path in (tmp_path / "writer").rglob("*.json")
+    )
+    assert writer_files == pystac_files
+    for path in pystac_files:
+        written = (tmp_path / "writer" / path).read_bytes()
+        assert written == (tmp_path / "pystac" / path).read_bytes()
+
+    read_catalog = pystac.Catalog.from_file(tmp_path / "writer" / "catalog.json")
+    assert [item.id for item in read_catalog.get_items()] == item_ids
+
+
+def test_catalog_writer_duplicate_item(tmp_path: Path) -> None:
+    """Items ids are unique."""
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+    with CatalogWriter(tmp_path, catalog) as writer:
+        writer.write_item(make_item("item"))
+        with pytest.raises(ValueError, match="duplicate item"):
+            writer.write_item(make_item("item"))
+
+
+def test_catalog_writer_error(tmp_path: Path) -> None:
+    """The root catalog is not written on error."""
+    catalog = pystac.Catalog(id="catalog", description="Test catalog.")
+
+    def write_and_fail() -> None:
+        with CatalogWriter(tmp_path, catalog) as writer:
+            writer.write_item(make_item("item"))
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        write_and_fail()
+
+    assert not (tmp_path / "catalog.json").exists()